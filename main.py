@@ -3,6 +3,8 @@ import signal
 import sys
 import os
 import argparse  # 导入 argparse
+import platform
+import re
 
 # 尝试导入 tomllib (Python 3.11+), 否则使用 toml
 try:
@@ -14,12 +16,8 @@ except ModuleNotFoundError:
         print("错误：需要安装 TOML 解析库。请运行 'pip install toml'", file=sys.stderr)
         sys.exit(1)
 
-# 从 src 目录导入核心类和插件管理器
-from src.core.amaidesu_core import AmaidesuCore
-from src.core.plugin_manager import PluginManager
-from src.core.pipeline_manager import PipelineManager  # 导入管道管理器
-from src.utils.logger import get_logger
-from src.utils.config import initialize_configurations  # Updated import
+# 核心类、插件/管道管理器在 main() 中按需导入，使 `--help` 等无需启动的路径不必加载 maim_message/aiohttp 等依赖
+from src.utils.logger import get_logger, LOG_FORMAT
 
 logger = get_logger("Main")
 
@@ -27,9 +25,8 @@ logger = get_logger("Main")
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-async def main():
-    """应用程序主入口点。"""
-
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数。"""
     # 创建命令行参数解析器
     parser = argparse.ArgumentParser(description="Amaidesu 应用程序")
     # 添加 --debug 参数，用于控制日志级别
@@ -41,12 +38,74 @@ async def main():
         metavar="MODULE_NAME",  # 在帮助信息中显示的参数名
         help="仅显示指定模块的 INFO/DEBUG 级别日志 (WARNING 及以上级别总是显示)",
     )
+    # 添加 --loop 参数，用于选择事件循环实现
+    parser.add_argument(
+        "--loop",
+        choices=["asyncio", "uvloop"],
+        default="uvloop",
+        help="事件循环实现 (默认 uvloop，Windows 上使用 winloop；未安装时自动回退到 asyncio)",
+    )
+    # 添加 --io-uring 参数，在 Linux 上使用基于 io_uring 的事件循环
+    parser.add_argument(
+        "--io-uring",
+        action="store_true",
+        help="在 Linux (内核 >= 5.11) 上使用 uringcore 提供的 io_uring 事件循环，不可用时回退到 --loop 指定的实现",
+    )
     # 解析命令行参数
-    args = parser.parse_args()
+    return parser.parse_args()
+
+
+def _kernel_supports_io_uring(min_version: tuple = (5, 11)) -> bool:
+    """检查当前系统是否为 Linux 且内核版本满足 io_uring 事件循环的要求。"""
+    if platform.system() != "Linux":
+        return False
+    match = re.match(r"(\d+)\.(\d+)", platform.release())
+    if not match:
+        return False
+    return (int(match.group(1)), int(match.group(2))) >= min_version
+
+
+def install_event_loop(loop_name: str, io_uring: bool = False) -> str:
+    """
+    根据命令行参数安装事件循环策略，必须在 asyncio.run() 之前调用。
+
+    Args:
+        loop_name: 期望使用的事件循环实现 ("asyncio" 或 "uvloop")。
+        io_uring: 是否优先尝试 uringcore 的 io_uring 事件循环 (仅 Linux >= 5.11)。
+
+    Returns:
+        实际生效的事件循环实现名称。依赖未安装或平台不支持时依次回退到 loop_name 和 "asyncio"。
+    """
+    if io_uring and _kernel_supports_io_uring():
+        try:
+            import uringcore  # type: ignore
+
+            asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+            return "io_uring"
+        except ImportError:
+            pass  # 回退到 loop_name 指定的实现
+    if loop_name == "asyncio":
+        return "asyncio"
+    try:
+        if sys.platform == "win32":
+            import winloop  # type: ignore
+
+            asyncio.set_event_loop_policy(winloop.EventLoopPolicy())
+            return "winloop"
+        import uvloop  # type: ignore
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+
+async def main(args: argparse.Namespace, loop_name: str = "asyncio"):
+    """应用程序主入口点。"""
 
     # --- 配置日志 ---
     base_level = "DEBUG" if args.debug else "INFO"
-    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{line: <4}</cyan> | <cyan>{extra[module]}</cyan> - <level>{message}</level>"
+    log_format = LOG_FORMAT
 
     # 清除所有预设的 handler (包括 src/utils/logger.py 中添加的)
     logger.remove()
@@ -54,17 +113,16 @@ async def main():
     module_filter_func = None
     if args.filter:
         filtered_modules = set(args.filter)  # 使用集合提高查找效率
+        # 过滤器对每条日志都会执行，WARNING 的级别数值只查询一次
+        warning_no = logger.level("WARNING").no
 
         def filter_logic(record):
             # 总是允许 WARN/ERROR/CRITICAL 级别通过
-            if record["level"].no >= logger.level("WARNING").no:
-                return True
-            # 检查模块名是否在过滤列表中
-            module_name = record["extra"].get("module")
-            if module_name and module_name in filtered_modules:
+            if record["level"].no >= warning_no:
                 return True
+            # 检查模块名是否在过滤列表中 (不在集合中的 None 也会被过滤掉)
             # 其他 DEBUG/INFO 级别的日志，如果模块不在列表里，则过滤掉
-            return False
+            return record["extra"].get("module") in filtered_modules
 
         module_filter_func = filter_logic
         # 使用一个临时 logger 配置来打印这条信息，确保它不被自身过滤掉
@@ -73,12 +131,14 @@ async def main():
         logger.remove()  # 移除临时 handler
 
     # 添加最终的 handler，应用过滤器（如果定义了）
+    # enqueue=True: 日志记录先进入队列，由后台线程写入 stderr，避免终端 I/O 阻塞事件循环
     logger.add(
         sys.stderr,
         level=base_level,
         colorize=True,
         format=log_format,
         filter=module_filter_func,  # 如果 args.filter 为 None，filter 参数为 None，表示不过滤
+        enqueue=True,
     )
 
     # 打印日志级别和过滤器状态相关的提示信息
@@ -91,8 +151,19 @@ async def main():
         # 如果只设置了 filter 但没设置 debug
         logger.info(f"日志过滤器已激活: {list(filtered_modules)} (INFO 级别)")
 
+    if args.io_uring and loop_name != "io_uring":
+        logger.warning("io_uring 事件循环不可用 (需要 Linux 内核 >= 5.11 并安装 uringcore)，已回退。")
+    if args.loop != "asyncio" and loop_name == "asyncio":
+        logger.warning(f"未安装 {args.loop}，已回退到标准 asyncio 事件循环。")
+    logger.info(f"事件循环: {loop_name}")
     logger.info("启动 Amaidesu 应用程序...")
 
+    # 从 src 目录导入核心类和插件管理器
+    from src.core.amaidesu_core import AmaidesuCore
+    from src.core.plugin_manager import PluginManager
+    from src.core.pipeline_manager import PipelineManager  # 导入管道管理器
+    from src.utils.config import initialize_configurations  # Updated import
+
     # --- 初始化所有配置 ---
     try:
         config, main_cfg_copied, plugin_cfg_copied, pipeline_cfg_copied = initialize_configurations(
@@ -240,8 +311,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    cli_args = parse_args()
+    active_loop = install_event_loop(cli_args.loop, io_uring=cli_args.io_uring)
     try:
-        asyncio.run(main())
+        asyncio.run(main(cli_args, active_loop))
     except KeyboardInterrupt:
         # 在 asyncio.run 之外捕获 KeyboardInterrupt (尽管上面的信号处理应该先触发)
         logger.info("检测到 KeyboardInterrupt，强制退出。")
+    finally:
+        # 移除 handler 会等待后台日志线程写完队列中剩余的日志
+        logger.remove()
@@ -30,7 +30,7 @@ from maim_message.message_base import BaseMessageInfo, FormatInfo, Seg, UserInfo
 from maim_message import MessageBase
 import tomllib
 from aiohttp import web, WSMsgType
-from src.utils.logger import get_logger
+from src.utils.logger import get_logger, LOG_FORMAT
 
 logger = get_logger("mock_maicore")
 
@@ -49,6 +49,7 @@ CONFIG_FILE_PATH = "config.toml"
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8000
 EMOJI_PATH = "data/emoji"
+EMOJI_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
 
 # 存储所有连接的 WebSocket 客户端
 clients: Set[web.WebSocketResponse] = set()
@@ -140,14 +141,21 @@ async def broadcast_message(message: MessageBase):
 def get_random_emoji() -> str:
     """从表情包目录中随机选择一个表情包并转换为base64"""
     try:
-        emoji_files = [f for f in os.listdir(EMOJI_PATH) if f.lower().endswith((".png", ".jpg", ".jpeg", ".gif"))]
-        if not emoji_files:
+        # 蓄水池抽样：单次遍历目录即可等概率选出一个文件，无需先构建完整的文件列表
+        emoji_path = None
+        candidate_count = 0
+        with os.scandir(EMOJI_PATH) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(EMOJI_EXTENSIONS):
+                    continue
+                candidate_count += 1
+                if random.randrange(candidate_count) == 0:
+                    emoji_path = entry.path
+
+        if emoji_path is None:
             logger.warning("表情包目录为空")
             return None
 
-        random_emoji = random.choice(emoji_files)
-        emoji_path = os.path.join(EMOJI_PATH, random_emoji)
-
         with open(emoji_path, "rb") as f:
             image_data = f.read()
             base64_data = base64.b64encode(image_data).decode("utf-8")
@@ -157,35 +165,30 @@ def get_random_emoji() -> str:
         return None
 
 
-def build_message(content: str, message_type: str = "text") -> MessageBase:
-    """构建MessageBase"""
-    msg_id = str(uuid.uuid4())
-    now = time.time()
-
-    platform = "mock-maicore"
-
-    user_info = UserInfo(
-        platform=platform,
-        user_id=123456,
-        user_nickname="麦麦",
-        user_cardname="麦麦",
-    )
+# 每条消息都相同的字段只构建一次，build_message 中直接复用
+MOCK_PLATFORM = "mock-maicore"
+MOCK_USER_INFO = UserInfo(
+    platform=MOCK_PLATFORM,
+    user_id=123456,
+    user_nickname="麦麦",
+    user_cardname="麦麦",
+)
+MOCK_FORMAT_INFO = FormatInfo(
+    content_format=["text", "emoji"],
+    accept_format=["text", "emoji"],
+)
 
-    group_info = None
-
-    format_info = FormatInfo(
-        content_format=["text", "emoji"],
-        accept_format=["text", "emoji"],
-    )
 
+def build_message(content: str, message_type: str = "text") -> MessageBase:
+    """构建MessageBase"""
     message_info = BaseMessageInfo(
-        platform=platform,
-        message_id=msg_id,
-        time=now,
-        user_info=user_info,
-        group_info=group_info,
+        platform=MOCK_PLATFORM,
+        message_id=str(uuid.uuid4()),
+        time=time.time(),
+        user_info=MOCK_USER_INFO,
+        group_info=None,
         template_info=None,
-        format_info=format_info,
+        format_info=MOCK_FORMAT_INFO,
         additional_config={},
     )
 
@@ -384,17 +387,19 @@ async def main():
 
     # --- 配置日志 ---
     base_level = "DEBUG" if args.debug else "INFO"
-    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{line: <4}</cyan> | <cyan>{extra[module]}</cyan> - <level>{message}</level>"
+    log_format = LOG_FORMAT
 
     # 清除所有预设的 handler (包括 src/utils/logger.py 中添加的)
     logger.remove()
 
     # 添加最终的 handler，应用过滤器（如果定义了）
+    # enqueue=True: 与 main.py 一致，日志记录先进入队列，由后台线程写入 stderr，避免终端 I/O 阻塞事件循环
     logger.add(
         sys.stderr,
         level=base_level,
         colorize=True,
         format=log_format,
+        enqueue=True,
     )
 
     # 打印日志级别和过滤器状态相关的提示信息
@@ -441,3 +446,6 @@ if __name__ == "__main__":
         logger.info("通过 Ctrl+C 强制退出。")
     except Exception as e:
         logger.critical(f"程序意外终止: {e}", exc_info=True)
+    finally:
+        # 移除 handler 会等待后台日志线程写完队列中剩余的日志
+        logger.remove()
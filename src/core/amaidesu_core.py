@@ -1,4 +1,5 @@
 import asyncio
+import inspect
 from typing import Callable, Dict, Any, Optional
 
 # 注意：需要安装 aiohttp
@@ -47,11 +48,19 @@ class AmaidesuCore:
         self.platform = platform
         self.ws_url = f"ws://{maicore_host}:{maicore_port}/ws"
         self._router: Optional[Router] = None
-        self._message_handlers: Dict[
-            str, list[Callable[[MessageBase], asyncio.Task]]
-        ] = {}  # 按消息类型或其他标识符存储处理器
-        self._http_request_handlers: Dict[str, list[Callable[[web.Request], asyncio.Task]]] = {}  # 用于 HTTP 请求处理
+        # 按消息类型或其他标识符存储处理器。处理器以元组保存，注册时整体替换 (写时复制)，
+        # 分发时遍历的是不可变快照，不受分发过程中新注册处理器的影响
+        self._message_handlers: Dict[str, tuple[Callable[[MessageBase], asyncio.Task], ...]] = {}
+        # "*" 通配符处理器每条消息都要查询，单独保存一份引用，注册时同步更新
+        self._wildcard_handlers: tuple[Callable[[MessageBase], asyncio.Task], ...] = ()
+        # 处理器上次执行是否出错：持续出错的处理器只在首次失败时记录完整堆栈，避免每条消息刷屏
+        self._failing_handlers: set[Callable[[MessageBase], asyncio.Task]] = set()
+        self._http_request_handlers: Dict[
+            str, tuple[Callable[[web.Request], asyncio.Task], ...]
+        ] = {}  # 用于 HTTP 请求处理
         self._services: Dict[str, Any] = {}  # 新增：用于存储已注册的服务
+        # 已告警过的未注册服务名：可选服务缺失时插件会每条消息查询一次，同名只告警一次
+        self._missing_services_warned: set[str] = set()
         self._is_connected = False
         self._connect_lock = asyncio.Lock()  # 防止并发连接
 
@@ -187,7 +196,8 @@ class AmaidesuCore:
             # 初始时认为未连接，等待 run() 任务稳定运行
             # 可以增加一个短暂的延迟，或者依赖 Router 的内部状态/回调（如果可用）
             # 简单起见，我们假设任务启动后一小段时间就算连接成功
-            await asyncio.sleep(1)  # 等待 1 秒尝试连接
+            # 最多等待 1 秒尝试连接；若 run() 任务在此期间就已结束（连接失败），立即返回而不是固定睡满 1 秒
+            await asyncio.wait({self._ws_task}, timeout=1)
             if self._ws_task and not self._ws_task.done():
                 self.logger.info("WebSocket 连接初步建立，标记核心为已连接。")
                 self._is_connected = True
@@ -308,7 +318,7 @@ class AmaidesuCore:
             # 可以考虑将消息放入待发队列
             return
 
-        self.logger.debug(f"准备向 MaiCore 发送消息: {message.message_info.message_id}")
+        self.logger.debug("准备向 MaiCore 发送消息: {}", message.message_info.message_id)
 
         # 如果有管道管理器，通过管道处理消息
         processed_message = message
@@ -322,14 +332,10 @@ class AmaidesuCore:
 
         try:
             # Add debug log for the message content just before sending via router
-            try:
-                message_dict_for_log = processed_message.to_dict()
-                self.logger.debug(
-                    f"发送给 Router 的消息内容: {str(message_dict_for_log)}..."
-                )  # Log partial dict string
-            except Exception as log_err:
-                self.logger.error(f"在记录消息日志时出错: {log_err}")  # Log error during logging itself
-                self.logger.debug(f"发送给 Router 的消息对象 (repr): {repr(processed_message)}")  # Fallback to repr
+            # 使用 lazy 模式，仅在 DEBUG 级别启用时才序列化消息，避免每条消息都付出 to_dict/str 的开销
+            self.logger.opt(lazy=True).debug(
+                "发送给 Router 的消息内容: {}...", lambda: self._describe_message_for_log(processed_message)
+            )
 
             await self._router.send_message(processed_message)
             self.logger.info(
@@ -339,6 +345,14 @@ class AmaidesuCore:
             self.logger.error(f"发送消息到 MaiCore 时出错: {e}", exc_info=True)
             # 发送失败处理，例如重试或通知插件
 
+    def _describe_message_for_log(self, message: MessageBase) -> str:
+        """将消息转换为用于 DEBUG 日志的字符串，转换失败时回退到 repr。"""
+        try:
+            return str(message.to_dict())
+        except Exception as log_err:
+            self.logger.error(f"在记录消息日志时出错: {log_err}")  # Log error during logging itself
+            return f"(repr) {repr(message)}"  # Fallback to repr
+
     async def _handle_maicore_message(self, message_data: Dict[str, Any]):
         """
         内部方法，处理从 MaiCore WebSocket 收到的原始消息。
@@ -347,7 +361,7 @@ class AmaidesuCore:
         Args:
             message_data: 从 Router 收到的原始消息字典。
         """
-        self.logger.debug(f"收到来自 MaiCore 的原始数据: {str(message_data)[:200]}...")
+        self.logger.opt(lazy=True).debug("收到来自 MaiCore 的原始数据: {}...", lambda: str(message_data)[:200])
         try:
             message_base = MessageBase.from_dict(message_data)
             self.logger.info(
@@ -363,31 +377,74 @@ class AmaidesuCore:
                 dispatch_key = message_base.message_segment.type  # 使用 segment 类型作为分发键
 
             # 查找并调用处理器
-            if dispatch_key in self._message_handlers:
-                handlers = self._message_handlers[dispatch_key]
+            # 用 get 一次查找代替 "in 判断 + 下标取值" 的两次哈希查找
+            handlers = self._message_handlers.get(dispatch_key)
+            if handlers:
                 self.logger.info(
                     f"为消息 {message_base.message_info.message_id} 找到 {len(handlers)} 个 '{dispatch_key}' 处理器"
                 )
-                # 并发执行所有匹配的处理器
-                tasks = [asyncio.create_task(handler(message_base)) for handler in handlers]
-                await asyncio.gather(*tasks, return_exceptions=True)  # return_exceptions=True 方便调试
+                # 并发执行所有匹配的处理器 (gather 会自行将协程包装为任务)
+                results = await asyncio.gather(*(handler(message_base) for handler in handlers), return_exceptions=True)
+                self._check_handler_results(handlers, results, dispatch_key)
             else:
                 self.logger.info(
                     f"没有找到适用于消息类型 '{dispatch_key}' 的处理器: {message_base.message_info.message_id}"
                 )
 
             # 也可以有一个处理所有消息的 "通配符" 处理器列表
-            if "*" in self._message_handlers:
-                wildcard_handlers = self._message_handlers["*"]
+            wildcard_handlers = self._wildcard_handlers
+            if wildcard_handlers:
                 self.logger.info(
                     f"为消息 {message_base.message_info.message_id} 找到 {len(wildcard_handlers)} 个通配符处理器"
                 )
-                tasks = [asyncio.create_task(handler(message_base)) for handler in wildcard_handlers]
-                await asyncio.gather(*tasks, return_exceptions=True)
+                results = await asyncio.gather(
+                    *(handler(message_base) for handler in wildcard_handlers), return_exceptions=True
+                )
+                self._check_handler_results(wildcard_handlers, results, "*")
 
         except Exception as e:
             self.logger.error(f"处理 MaiCore 消息时发生错误: {e}", exc_info=True)
 
+    def _check_handler_results(self, handlers: tuple[Callable, ...], results: list[Any], dispatch_key: str) -> None:
+        """记录处理器抛出的异常：同一处理器连续失败时只有第一次附带堆栈，成功一次后重置。"""
+        for handler, result in zip(handlers, results, strict=True):
+            # CancelledError 等也算失败，与 PluginManager 对 gather 结果的判断一致
+            if not isinstance(result, BaseException):
+                self._failing_handlers.discard(handler)
+                continue
+            # functools.partial 等可调用对象没有 __name__
+            handler_name = getattr(handler, "__name__", repr(handler))
+            if handler in self._failing_handlers:
+                self.logger.warning("'{}' 处理器 {} 再次出错: {}", dispatch_key, handler_name, result)
+            else:
+                self._failing_handlers.add(handler)
+                # loguru 不识别 exc_info=异常对象，需用 opt(exception=...) 附带堆栈；
+                # 异常文本只作为参数传入，避免其中的花括号被当作格式串解析
+                self.logger.opt(exception=result).error("'{}' 处理器 {} 出错: {}", dispatch_key, handler_name, result)
+
+    def _validate_handler(self, kind: str, handler: Callable) -> bool:
+        """
+        在注册时检查处理器是否为可以接收一个参数的异步函数。
+
+        不合格的处理器在分发时会让 gather 抛出 TypeError，导致同一条消息的其余处理器也无法执行，
+        因此在注册时直接拒绝，分发时即可信任所有已注册的处理器。
+
+        Returns:
+            处理器合格返回 True，否则记录错误并返回 False
+        """
+        handler_name = getattr(handler, "__name__", repr(handler))
+        if not asyncio.iscoroutinefunction(handler):
+            self.logger.error(f"注册的 {kind} 处理器 '{handler_name}' 不是一个异步函数 (async def)，已拒绝注册。")
+            return False
+        try:
+            inspect.signature(handler).bind(None)
+        except TypeError:
+            self.logger.error(f"注册的 {kind} 处理器 '{handler_name}' 无法只接收一个参数，已拒绝注册。")
+            return False
+        except ValueError:
+            pass  # 无法获取签名 (如部分内置对象)，不做参数检查
+        return True
+
     def register_websocket_handler(self, message_type_or_key: str, handler: Callable[[MessageBase], asyncio.Task]):
         """
         注册一个消息处理器。
@@ -398,14 +455,15 @@ class AmaidesuCore:
             message_type_or_key: 标识消息类型的字符串 (例如 "text", "vts_command", "danmu", 或自定义键, "*" 表示所有消息)。
             handler: 一个异步函数，接收 MessageBase 对象作为参数。
         """
-        if not asyncio.iscoroutinefunction(handler):
-            self.logger.warning(f"注册的 WebSocket 处理器 '{handler.__name__}' 不是一个异步函数 (async def)。")
-            # raise TypeError("Handler must be an async function")
+        if not self._validate_handler("WebSocket", handler):
+            return
 
-        if message_type_or_key not in self._message_handlers:
-            self._message_handlers[message_type_or_key] = []
-        self._message_handlers[message_type_or_key].append(handler)
-        self.logger.info(f"成功注册 WebSocket 消息处理器: Key='{message_type_or_key}', Handler='{handler.__name__}'")
+        handlers = self._message_handlers.get(message_type_or_key, ()) + (handler,)
+        self._message_handlers[message_type_or_key] = handlers
+        if message_type_or_key == "*":
+            self._wildcard_handlers = handlers
+        handler_name = getattr(handler, "__name__", repr(handler))
+        self.logger.info(f"成功注册 WebSocket 消息处理器: Key='{message_type_or_key}', Handler='{handler_name}'")
 
     async def _handle_http_request(self, request: web.Request) -> web.Response:
         """
@@ -419,8 +477,8 @@ class AmaidesuCore:
         dispatch_key = "http_callback"  # 或者从 request 中提取更具体的 key
 
         response_tasks = []
-        if dispatch_key in self._http_request_handlers:
-            handlers = self._http_request_handlers[dispatch_key]
+        handlers = self._http_request_handlers.get(dispatch_key)
+        if handlers:
             self.logger.info(f"为 HTTP 请求找到 {len(handlers)} 个 '{dispatch_key}' 处理器")
             # 让每个 handler 处理请求，它们应该返回 web.Response 或引发异常
             for handler in handlers:
@@ -472,14 +530,12 @@ class AmaidesuCore:
             key: 用于匹配请求的键 (当前简单实现只支持固定 key)。
             handler: 一个异步函数，接收 aiohttp.web.Request 对象，并应返回 aiohttp.web.Response 对象。
         """
-        if not asyncio.iscoroutinefunction(handler):
-            self.logger.warning(f"注册的 HTTP 处理器 '{handler.__name__}' 不是一个异步函数 (async def)。")
-            # raise TypeError("Handler must be an async function")
+        if not self._validate_handler("HTTP", handler):
+            return
 
-        if key not in self._http_request_handlers:
-            self._http_request_handlers[key] = []
-        self._http_request_handlers[key].append(handler)
-        self.logger.info(f"成功注册 HTTP 请求处理器: Key='{key}', Handler='{handler.__name__}'")
+        self._http_request_handlers[key] = self._http_request_handlers.get(key, ()) + (handler,)
+        handler_name = getattr(handler, "__name__", repr(handler))
+        self.logger.info(f"成功注册 HTTP 请求处理器: Key='{key}', Handler='{handler_name}'")
 
     # --- 服务注册与发现 ---
     def register_service(self, name: str, service_instance: Any):
@@ -507,9 +563,12 @@ class AmaidesuCore:
         """
         service = self._services.get(name)
         if service:
-            self.logger.debug(f"获取服务 '{name}' 成功。")
+            self.logger.debug("获取服务 '{}' 成功。", name)
+        elif name not in self._missing_services_warned:
+            self._missing_services_warned.add(name)
+            self.logger.warning(f"尝试获取未注册的服务: '{name}' (后续同名查询不再告警)")
         else:
-            self.logger.warning(f"尝试获取未注册的服务: '{name}'")
+            self.logger.debug("尝试获取未注册的服务: '{}'", name)
         return service
 
     # --- 插件管理占位符 (可移除) ---
@@ -1,5 +1,6 @@
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
 import asyncio
+import time
 
 from src.utils.logger import get_logger
 
@@ -36,6 +37,9 @@ class ContextManager:
         # --- 存储上下文提供者 ---
         # Key: provider_name, Value: ContextProviderData
         self._context_providers: Dict[str, ContextProviderData] = {}
+        # 按 (优先级, 名称) 排好序的提供者列表，仅在注册/注销后重新排序，而不是每次获取上下文都排序
+        self._sorted_providers: List[ContextProviderData] = []
+        self._sorted: bool = True  # 标记 _sorted_providers 是否与 _context_providers 一致
 
         # --- 配置值 ---
         self.enabled = config.get("enabled", True)
@@ -44,6 +48,13 @@ class ContextManager:
         self.title_separator = self.formatting_config.get("title_separator", ": ")
         self.default_max_length = self.limits_config.get("default_max_length", 1000)
         self.default_priority = self.limits_config.get("default_priority", 100)
+        # 动态（可调用）提供者结果的最短缓存时间（秒）。弹幕等高频来源会在短时间内多次获取上下文，
+        # 在此间隔内直接复用上一次的结果，避免重复调用提供者；设为 0 关闭缓存
+        self.dynamic_cache_seconds = max(0.0, self.limits_config.get("dynamic_cache_seconds", 1.0))
+
+        # --- 动态提供者结果缓存 ---
+        # Key: provider_name, Value: (获取时间 monotonic, 上下文值)
+        self._dynamic_cache: Dict[str, Tuple[float, Optional[str]]] = {}
 
         self.logger.info(f"上下文管理器初始化完成，启用状态: {self.enabled}")
         self.logger.debug(f"格式化配置: separator='{self.separator}', add_provider_title={self.add_provider_title}")
@@ -94,6 +105,8 @@ class ContextManager:
             "enabled": enabled,
         }
         self._context_providers[provider_name] = provider_data
+        self._sorted = False
+        self._dynamic_cache.pop(provider_name, None)
         self.logger.info(
             f"上下文提供者 '{provider_name}' 已注册/更新（优先级：{resolved_priority}，已启用：{enabled}）。"
         )
@@ -135,8 +148,16 @@ class ContextManager:
 
         provider = self._context_providers[provider_name]
         updated = False
+        # 与当前值相同的字段视为已是目标状态：不重复写入、记录日志或使动态缓存失效
+        if context_info is not None and context_info == provider["context_info"]:
+            context_info = None
+            updated = True
+        if enabled is not None and enabled == provider["enabled"]:
+            enabled = None
+            updated = True
         if context_info is not None:
             provider["context_info"] = context_info
+            self._dynamic_cache.pop(provider_name, None)
             self.logger.info(f"已更新 '{provider_name}' 的上下文信息。")
             self.logger.debug(f"新上下文：'{context_info[:100]}...'")
             updated = True
@@ -151,12 +172,67 @@ class ContextManager:
         """移除上下文提供者。"""
         if provider_name in self._context_providers:
             del self._context_providers[provider_name]
+            self._sorted = False
+            self._dynamic_cache.pop(provider_name, None)
             self.logger.info(f"上下文提供者 '{provider_name}' 已注销。")
             return True
         else:
             self.logger.warning(f"尝试注销不存在的提供者：'{provider_name}'")
             return False
 
+    def _ensure_sorted(self) -> List[ContextProviderData]:
+        """确保提供者列表按优先级（升序）然后按名称（字母顺序稳定性）排序，并返回该列表"""
+        if not self._sorted:
+            self._sorted_providers = sorted(
+                self._context_providers.values(), key=lambda p: (p["priority"], p["provider_name"])
+            )
+            self._sorted = True
+        return self._sorted_providers
+
+    async def _resolve_context_value(self, provider: ContextProviderData) -> Optional[str]:
+        """
+        获取单个提供者的上下文值，处理字符串和异步可调用的 context_info。
+
+        Args:
+            provider: 上下文提供者数据
+
+        Returns:
+            上下文字符串；出错、类型不支持或提供者被跳过时返回 None
+        """
+        provider_name = provider["provider_name"]
+        raw_context_info = provider["context_info"]
+
+        if callable(raw_context_info):
+            if self.dynamic_cache_seconds > 0:
+                cached = self._dynamic_cache.get(provider_name)
+                if cached is not None and time.monotonic() - cached[0] < self.dynamic_cache_seconds:
+                    return cached[1]
+            value = await self._call_context_provider(provider_name, raw_context_info)
+            if self.dynamic_cache_seconds > 0:
+                self._dynamic_cache[provider_name] = (time.monotonic(), value)
+            return value
+        if isinstance(raw_context_info, str):
+            return raw_context_info
+
+        self.logger.warning(f"提供者 '{provider_name}' 的 context_info 类型意外：{type(raw_context_info)}。跳过。")
+        return None
+
+    async def _call_context_provider(self, provider_name: str, raw_context_info: Any) -> Optional[str]:
+        """调用可调用的 context_info，出错或不是异步函数时返回 None。"""
+        self.logger.debug(f"调用异步提供者：{provider_name}")
+        try:
+            # 检查是否是协程函数（更健壮的方式）
+            if asyncio.iscoroutinefunction(raw_context_info):
+                return await raw_context_info()
+            # 如果不是 async def 但可调用（虽然我们期望是 async）
+            # 可以在这里决定是否支持同步可调用，或者直接报错/跳过
+            self.logger.warning(f"上下文提供者 '{provider_name}' 是可调用的但不是异步函数。跳过。")
+            return None
+        except Exception as e:
+            self.logger.error(f"调用上下文提供者 '{provider_name}' 时出错：{e}", exc_info=True)
+            # 出错时可以跳过这个提供者
+            return None
+
     async def get_formatted_context(self, tags: Optional[List[str]] = None, max_length: Optional[int] = None) -> str:
         """
         从已启用的提供者检索并格式化聚合上下文，
@@ -175,9 +251,9 @@ class ContextManager:
 
         target_max_length = max_length if max_length is not None else self.default_max_length
 
-        # 1. 按启用状态和标签过滤提供者
+        # 1. 按启用状态和标签过滤提供者（遍历已排好序的列表，过滤后仍保持优先级顺序）
         eligible_providers = []
-        for provider in self._context_providers.values():
+        for provider in self._ensure_sorted():
             if not provider["enabled"]:
                 continue
             if tags:  # 检查提供者的标签中是否存在所有请求的标签
@@ -185,42 +261,27 @@ class ContextManager:
                     continue
             eligible_providers.append(provider)
 
-        # 2. 按优先级（升序）然后按名称（字母顺序稳定性）排序
-        eligible_providers.sort(key=lambda p: (p["priority"], p["provider_name"]))
-        self.logger.debug(f"上下文的合格提供者：{[p['provider_name'] for p in eligible_providers]}")
+        # 没有合格提供者时直接返回，跳过后续的 gather 与拼接
+        if not eligible_providers:
+            self.logger.debug("没有合格的上下文提供者。")
+            return ""
+
+        # 2. 已按优先级（升序）然后按名称排序，无需再排序
+        self.logger.opt(lazy=True).debug(
+            "上下文的合格提供者：{}", lambda: [p["provider_name"] for p in eligible_providers]
+        )
 
-        # 3. 格式化并组合上下文字符串
+        # 3. 并发获取所有提供者的上下文值：动态提供者（如屏幕描述）各自可能有 I/O 等待，
+        #    并发调用使总耗时取决于最慢的一个，而不是所有提供者耗时之和
+        context_values = await asyncio.gather(*(self._resolve_context_value(p) for p in eligible_providers))
+
+        # 4. 按优先级顺序格式化并组合上下文字符串
         context_parts: List[str] = []
         current_length = 0
         separator_len = len(self.separator)
 
-        for provider in eligible_providers:
-            context_value: Optional[str] = None
+        for provider, context_value in zip(eligible_providers, context_values, strict=True):
             provider_name = provider["provider_name"]
-            raw_context_info = provider["context_info"]
-
-            # --- 获取上下文值（处理可调用对象）---
-            if callable(raw_context_info):
-                self.logger.debug(f"调用异步提供者：{provider_name}")
-                try:
-                    # 检查是否是协程函数（更健壮的方式）
-                    if asyncio.iscoroutinefunction(raw_context_info):
-                        context_value = await raw_context_info()
-                    else:  # 如果不是 async def 但可调用（虽然我们期望是 async）
-                        # 可以在这里决定是否支持同步可调用，或者直接报错/跳过
-                        self.logger.warning(f"上下文提供者 '{provider_name}' 是可调用的但不是异步函数。跳过。")
-                        continue
-                except Exception as e:
-                    self.logger.error(f"调用上下文提供者 '{provider_name}' 时出错：{e}", exc_info=True)
-                    # 出错时可以跳过这个提供者
-                    continue
-            elif isinstance(raw_context_info, str):
-                context_value = raw_context_info
-            else:
-                self.logger.warning(
-                    f"提供者 '{provider_name}' 的 context_info 类型意外：{type(raw_context_info)}。跳过。"
-                )
-                continue
 
             # --- 使用获取到的 context_value 进行后续处理 ---
             if not context_value:  # 跳过空上下文（可能在调用可调用对象后）
@@ -257,5 +318,5 @@ class ContextManager:
                     self.logger.warning(f"来自 '{provider_name}' 的上下文因 max_length 而完全跳过。")
                     break  # 停止处理更多提供者
 
-        self.logger.debug(f"连接前的最终上下文部分：{context_parts}")
+        self.logger.debug("连接前的最终上下文部分：{}", context_parts)
         return self.separator.join(context_parts)
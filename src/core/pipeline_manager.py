@@ -4,7 +4,7 @@ import inspect
 import os
 import sys
 
-from typing import Dict, List, Optional, Any, Type
+from typing import Dict, List, Optional, Any, Tuple, Type
 
 from maim_message import MessageBase
 from src.utils.logger import get_logger
@@ -74,7 +74,10 @@ class PipelineManager:
 
     def __init__(self):
         self._pipelines: List[MessagePipeline] = []
-        self._sorted: bool = True  # 标记管道列表是否已排序
+        # 排好序的管道快照：注册时只标记为脏，下次使用时重建为新元组，
+        # 正在 await 中的消息处理遍历的是旧快照，不受期间注册的影响
+        self._sorted_pipelines: Tuple[MessagePipeline, ...] = ()
+        self._sorted: bool = True  # 标记管道快照是否为最新
         self.logger = get_logger("PipelineManager")
 
     def register_pipeline(self, pipeline: MessagePipeline) -> None:
@@ -88,13 +91,14 @@ class PipelineManager:
         self._sorted = False
         self.logger.info(f"管道已注册: {pipeline.__class__.__name__} (优先级: {pipeline.priority})")
 
-    def _ensure_sorted(self) -> None:
-        """确保管道列表按优先级排序"""
+    def _ensure_sorted(self) -> Tuple[MessagePipeline, ...]:
+        """确保管道快照按优先级排序，并返回该快照"""
         if not self._sorted:
-            self._pipelines.sort(key=lambda x: x.priority)
+            self._sorted_pipelines = tuple(sorted(self._pipelines, key=lambda x: x.priority))
             self._sorted = True
-            pipe_info = ", ".join([f"{p.__class__.__name__}({p.priority})" for p in self._pipelines])
+            pipe_info = ", ".join([f"{p.__class__.__name__}({p.priority})" for p in self._sorted_pipelines])
             self.logger.debug(f"管道已排序: {pipe_info}")
+        return self._sorted_pipelines
 
     async def process_message(self, message: MessageBase) -> Optional[MessageBase]:
         """
@@ -106,22 +110,20 @@ class PipelineManager:
         Returns:
             处理后的 MessageBase 对象，如果任何管道返回 None 则返回 None
         """
-        self._ensure_sorted()
-
         current_message = message
-        for pipeline in self._pipelines:
+        # 消息 ID 在整个管道链中不变，只取一次，避免每个管道都重复两级属性查找
+        message_id = message.message_info.message_id
+        for pipeline in self._ensure_sorted():
             if current_message is None:
                 # 如果消息被某个管道丢弃，则终止处理
                 self.logger.info(f"消息被前序管道丢弃，终止于管道 {pipeline.__class__.__name__} 之前")
                 return None
 
             try:
-                self.logger.debug(f"管道 {pipeline.__class__.__name__} 开始处理消息: {message.message_info.message_id}")
+                self.logger.debug("管道 {} 开始处理消息: {}", pipeline.__class__.__name__, message_id)
                 current_message = await pipeline.process_message(current_message)
                 if current_message is None:
-                    self.logger.info(
-                        f"消息 {message.message_info.message_id} 被管道 {pipeline.__class__.__name__} 丢弃"
-                    )
+                    self.logger.info(f"消息 {message_id} 被管道 {pipeline.__class__.__name__} 丢弃")
                     return None
             except Exception as e:
                 self.logger.error(f"管道 {pipeline.__class__.__name__} 处理消息时出错: {e}", exc_info=True)
@@ -254,10 +256,9 @@ class PipelineManager:
         在 AmaidesuCore 成功连接到 MaiCore 后调用。
         按管道优先级顺序调用每个管道的 on_connect 方法。
         """
-        self._ensure_sorted()
         self.logger.info("通知所有管道：连接已建立")
 
-        for pipeline in self._pipelines:
+        for pipeline in self._ensure_sorted():
             try:
                 self.logger.debug(f"调用管道 {pipeline.__class__.__name__} 的 on_connect 方法")
                 await pipeline.on_connect()
@@ -273,10 +274,9 @@ class PipelineManager:
         在 AmaidesuCore 与 MaiCore 断开连接时调用。
         按管道优先级顺序调用每个管道的 on_disconnect 方法。
         """
-        self._ensure_sorted()
         self.logger.info("通知所有管道：连接已断开")
 
-        for pipeline in self._pipelines:
+        for pipeline in self._ensure_sorted():
             try:
                 self.logger.debug(f"调用管道 {pipeline.__class__.__name__} 的 on_disconnect 方法")
                 await pipeline.on_disconnect()
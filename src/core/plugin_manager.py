@@ -3,7 +3,7 @@ import importlib
 import inspect
 import os
 import sys
-from typing import TYPE_CHECKING, Dict, Any, Optional, Type
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Type
 
 # 避免循环导入，使用 TYPE_CHECKING
 if TYPE_CHECKING:
@@ -79,9 +79,15 @@ class PluginManager:
             sys.path.insert(0, src_dir)
             self.logger.debug(f"已将目录添加到 sys.path: {src_dir}")
 
-        for item in os.listdir(plugin_dir_abs):
-            item_path = os.path.join(plugin_dir_abs, item)
-            if os.path.isdir(item_path) and os.path.exists(os.path.join(item_path, "__init__.py")):
+        # 实例化后的插件先收集起来，最后并发执行 setup()，避免各插件的初始化 I/O 串行等待
+        pending_setups: List[Tuple[str, BasePlugin]] = []
+
+        # scandir 的 DirEntry 自带文件类型信息，筛选子目录时无需再逐项 stat
+        with os.scandir(plugin_dir_abs) as entries:
+            plugin_dirs = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
+
+        for item, item_path in plugin_dirs:
+            if os.path.exists(os.path.join(item_path, "__init__.py")):
                 plugin_name = item
                 plugin_module_file = os.path.join(item_path, "plugin.py")
                 self.logger.debug(f"检测到潜在插件目录: {plugin_name}")
@@ -144,10 +150,8 @@ class PluginManager:
                         self.logger.debug(f"准备实例化插件: {plugin_class.__name__}")
                         # 将合并后的最终配置传递给插件
                         plugin_instance = plugin_class(self.core, final_plugin_config)
-                        self.logger.debug(f"插件 '{plugin_class.__name__}' 实例化完成，准备调用 setup()")
-                        await plugin_instance.setup()
-                        self.loaded_plugins[plugin_name] = plugin_instance
-                        self.logger.info(f"成功加载并设置插件: {plugin_class.__name__} (来自 {plugin_name}/plugin.py)")
+                        self.logger.debug(f"插件 '{plugin_class.__name__}' 实例化完成，等待调用 setup()")
+                        pending_setups.append((plugin_name, plugin_instance))
                     else:
                         # 如果没有找到有效的 plugin_class (无论是没找到入口点还是入口点无效)
                         self.logger.warning(f"未能为模块 '{module_import_path}' 找到并验证有效的插件类。")
@@ -164,6 +168,21 @@ class PluginManager:
 
         # 注意：不再需要在每次循环后清理 sys.path，因为我们添加的是 src 目录
 
+        # --- 并发设置所有插件 ---
+        if pending_setups:
+            self.logger.debug(f"并发调用 {len(pending_setups)} 个插件的 setup()...")
+            results = await asyncio.gather(
+                *(plugin_instance.setup() for _, plugin_instance in pending_setups), return_exceptions=True
+            )
+            for (plugin_name, plugin_instance), result in zip(pending_setups, results, strict=True):
+                if isinstance(result, BaseException):
+                    self.logger.error(f"设置插件 '{plugin_name}' 时发生错误: {result}", exc_info=result)
+                    continue
+                self.loaded_plugins[plugin_name] = plugin_instance
+                self.logger.info(
+                    f"成功加载并设置插件: {plugin_instance.__class__.__name__} (来自 {plugin_name}/plugin.py)"
+                )
+
         self.logger.info(f"插件加载完成，共加载 {len(self.loaded_plugins)} 个插件。")
 
     async def unload_plugins(self):
@@ -176,10 +195,10 @@ class PluginManager:
 
         if unload_tasks:
             results = await asyncio.gather(*unload_tasks, return_exceptions=True)
-            for i, task in enumerate(unload_tasks):
-                plugin_name = list(self.loaded_plugins.keys())[i]
-                if isinstance(results[i], Exception):
-                    self.logger.error(f"清理插件 '{plugin_name}' 时出错: {results[i]}", exc_info=results[i])
+            # 任务与 loaded_plugins 的迭代顺序一致，直接按位置对应插件名，无需每次重建键列表
+            for plugin_name, result in zip(self.loaded_plugins, results, strict=True):
+                if isinstance(result, Exception):
+                    self.logger.error(f"清理插件 '{plugin_name}' 时出错: {result}", exc_info=result)
 
         self.loaded_plugins.clear()
         self.logger.info("所有插件已卸载。")
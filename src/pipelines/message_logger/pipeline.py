@@ -1,11 +1,38 @@
+import asyncio
 import json
 import os
+import time
 from typing import Dict, Optional, List, Iterator, Any
 
 from maim_message import MessageBase
 from src.core.pipeline_manager import MessagePipeline
 from src.utils.logger import get_logger
 
+# 可选依赖：安装了 orjson 时用它序列化/解析 JSONL 行 (纯 C 实现，比标准库 json 快数倍)，未安装时回退到标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+
+    def _dump_line(data: dict) -> str:
+        """将字典序列化为一行 JSON (含换行符)，非 ASCII 字符原样输出。"""
+        # OPT_NON_STR_KEYS：与标准库 json 一样把 int/float/bool/None 键转为字符串，否则 orjson 会抛 TypeError
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    _load_line = orjson.loads  # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+else:
+
+    def _dump_line(data: dict) -> str:
+        """将字典序列化为一行 JSON (含换行符)，非 ASCII 字符原样输出。"""
+        return json.dumps(data, ensure_ascii=False) + "\n"
+
+    _load_line = json.loads
+
+# 日志文件的写缓冲区大小 (128 KB)，配合 flush_interval 将多条消息合并为一次写入
+_FILE_BUFFER_SIZE = 128 * 1024
+
 # 为静态方法准备一个模块级 logger
 static_logger = get_logger("MessageLoggerPipelineUtils")
 
@@ -31,6 +58,7 @@ class MessageLoggerPipeline(MessagePipeline):
                 file_prefix (str): 日志文件名前缀 (默认: "messages_")
                 file_extension (str): 日志文件扩展名 (默认: ".jsonl")
                 default_group_id (str): 当没有群组ID时使用的默认ID (默认: "default")
+                flush_interval (float): 缓冲区刷新间隔，单位秒 (默认: 10)，小于等于 0 时每条消息都立即刷新
         """
         super().__init__(config)
 
@@ -39,6 +67,11 @@ class MessageLoggerPipeline(MessagePipeline):
         self._file_prefix = self.config.get("file_prefix", "messages_")
         self._file_extension = self.config.get("file_extension", ".jsonl")
         self._default_group_id = self.config.get("default_group_id", "default")
+        # 写入先进入文件缓冲区，按间隔统一刷新，避免每条消息都触发一次小块 write 系统调用
+        self._flush_interval: float = self.config.get("flush_interval", 10)
+        self._last_flush_time = time.monotonic()
+        # 后台定时刷新任务：一批消息写完后即使没有新消息，缓冲区内容也会在 flush_interval 内落盘
+        self._flush_task: Optional[asyncio.Task] = None
 
         # 确保日志目录存在
         os.makedirs(self._logs_dir, exist_ok=True)
@@ -49,12 +82,22 @@ class MessageLoggerPipeline(MessagePipeline):
         self.logger.info(f"消息日志管道初始化: 日志目录={self._logs_dir}")
 
     async def on_connect(self) -> None:
-        """连接建立时确保日志目录存在"""
+        """连接建立时确保日志目录存在，并启动定时刷新任务"""
         os.makedirs(self._logs_dir, exist_ok=True)
         self.logger.info("消息日志管道已确认日志目录存在")
+        if self._flush_interval > 0 and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._periodic_flush())
 
     async def on_disconnect(self) -> None:
-        """连接断开时关闭所有打开的文件句柄"""
+        """连接断开时停止定时刷新任务并关闭所有打开的文件句柄"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
         for group_id, file_handle in self._file_handles.items():
             try:
                 file_handle.close()
@@ -92,7 +135,7 @@ class MessageLoggerPipeline(MessagePipeline):
         """
         if group_id not in self._file_handles or self._file_handles[group_id].closed:
             file_path = self._get_file_path(group_id)
-            self._file_handles[group_id] = open(file_path, "a", encoding="utf-8")
+            self._file_handles[group_id] = open(file_path, "a", encoding="utf-8", buffering=_FILE_BUFFER_SIZE)
             self.logger.debug(f"已打开群组 {group_id} 的日志文件: {file_path}")
 
         return self._file_handles[group_id]
@@ -127,16 +170,39 @@ class MessageLoggerPipeline(MessagePipeline):
 
             # 格式化消息并写入
             formatted_message = self._format_message_for_log(message)
-            file_handle.write(json.dumps(formatted_message, ensure_ascii=False) + "\n")
-            file_handle.flush()  # 确保立即写入磁盘
-
-            self.logger.debug(
-                f"已记录消息: 群组={group_id}, 用户={formatted_message.get('user', {}).get('nickname', 'unknown')}, "
-                f"类型={formatted_message.get('content_type', 'unknown')}"
+            file_handle.write(_dump_line(formatted_message))
+            self._maybe_flush()
+
+            self.logger.opt(lazy=True).debug(
+                "已记录消息: 群组={}, 用户={}, 类型={}",
+                lambda: group_id,
+                lambda: formatted_message.get("user", {}).get("nickname", "unknown"),
+                lambda: formatted_message.get("content_type", "unknown"),
             )
         except Exception as e:
             self.logger.error(f"记录消息到日志文件时出错: {e}", exc_info=True)
 
+    def _maybe_flush(self) -> None:
+        """写入后调用：距上次刷新超过 flush_interval 时立即刷新 (flush_interval <= 0 时每次都刷新)。"""
+        if time.monotonic() - self._last_flush_time >= self._flush_interval:
+            self._flush_all()
+
+    def _flush_all(self) -> None:
+        """将所有打开的日志文件缓冲区写入磁盘。"""
+        self._last_flush_time = time.monotonic()
+        for file_handle in self._file_handles.values():
+            if not file_handle.closed:
+                file_handle.flush()
+
+    async def _periodic_flush(self) -> None:
+        """后台任务：每隔 flush_interval 秒刷新一次，保证消息停止写入后缓冲区内容也能及时落盘。"""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                self._flush_all()
+            except Exception as e:
+                self.logger.error(f"定时刷新日志文件时出错: {e}", exc_info=True)
+
     async def process_message(self, message: MessageBase) -> Optional[MessageBase]:
         """
         处理消息，将其记录到相应的日志文件中。
@@ -169,7 +235,7 @@ class MessageLoggerPipeline(MessagePipeline):
             with open(file_path, "r", encoding="utf-8") as f:
                 for line in f:
                     if line.strip():  # 忽略空行
-                        messages.append(json.loads(line))
+                        messages.append(_load_line(line))
         except Exception as e:
             static_logger.error(f"读取JSONL文件 {file_path} 时出错: {e}")
         return messages
@@ -189,7 +255,7 @@ class MessageLoggerPipeline(MessagePipeline):
             with open(file_path, "r", encoding="utf-8") as f:
                 for line in f:
                     if line.strip():  # 忽略空行
-                        yield json.loads(line)
+                        yield _load_line(line)
         except Exception as e:
             static_logger.error(f"流式读取JSONL文件 {file_path} 时出错: {e}")
 
@@ -213,7 +279,7 @@ class MessageLoggerPipeline(MessagePipeline):
                         continue
 
                     try:
-                        msg = json.loads(line)
+                        msg = _load_line(line)
                         # 兼容新旧两种格式
                         if "message_info" in msg and "user_info" in msg["message_info"]:
                             if msg["message_info"]["user_info"].get("user_id") == user_id:
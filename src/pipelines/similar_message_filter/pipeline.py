@@ -1,7 +1,7 @@
 import difflib
 import time
 import json
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from typing import Dict, List, Optional, Set, Tuple, Any
 
 from maim_message import MessageBase
@@ -42,16 +42,19 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         # 消息缓存，按群组ID分组存储
         # 结构: {group_id: deque([(timestamp, message_id, content, user_id), ...]}
         self.message_cache: Dict[str, deque] = defaultdict(deque)
+        # 缓存中的消息总数，随入队/出队增减，避免统计时遍历所有群组队列
+        self._cached_message_count = 0
 
-        # 已处理的消息ID集合，用于避免重复处理
-        self.processed_message_ids: Set[str] = set()
+        # 已处理的消息ID，按处理顺序保存 (值无意义)，超出上限时从最旧的一端淘汰
+        self.processed_message_ids: OrderedDict[str, None] = OrderedDict()
+        self.max_processed_ids = 1000
 
         # 记录被过滤的消息ID集合
         self.filtered_message_ids: Set[str] = set()
 
         # 清理线程状态
         self._cleanup_active = False
-        self._last_cleanup_time = time.time()
+        self._last_cleanup_time = time.monotonic()
 
         self.logger.info(
             f"相似消息过滤管道初始化: 相似度阈值={self.similarity_threshold}, 时间窗口={self.time_window}秒, "
@@ -72,13 +75,17 @@ class SimilarMessageFilterPipeline(MessagePipeline):
     def _clear_caches(self) -> None:
         """清理所有缓存"""
         self.message_cache.clear()
+        self._cached_message_count = 0
         self.processed_message_ids.clear()
         self.filtered_message_ids.clear()
         self.logger.debug("已清理相似消息过滤管道的所有缓存")
 
-    def _clean_expired_messages(self) -> None:
-        """清理过期的消息缓存"""
-        now = time.time()
+    def _clean_expired_messages(self, now: float) -> None:
+        """清理过期的消息缓存
+
+        Args:
+            now: 本次处理消息时读取的当前时间 (time.monotonic())
+        """
         cutoff_time = now - self.time_window
 
         # 跳过过于频繁的清理
@@ -87,25 +94,20 @@ class SimilarMessageFilterPipeline(MessagePipeline):
 
         self._last_cleanup_time = now
 
-        # 清理前的缓存状态
-        cache_stats_before = {
-            "group_count": len(self.message_cache),
-            "message_count": sum(len(queue) for queue in self.message_cache.values()),
-        }
-
         # 清理过期的消息缓存
-        for group_id in list(self.message_cache.keys()):
+        for group_id, group_cache in list(self.message_cache.items()):
             # 清理队列中的过期消息
             expired_count = 0
-            while self.message_cache[group_id] and self.message_cache[group_id][0][0] < cutoff_time:
-                self.message_cache[group_id].popleft()
+            while group_cache and group_cache[0][0] < cutoff_time:
+                group_cache.popleft()
                 expired_count += 1
 
             if expired_count > 0:
+                self._cached_message_count -= expired_count
                 self.logger.debug(f"群组 {group_id} 清理了 {expired_count} 条过期消息")
 
             # 如果群组的队列为空，则删除该群组的记录
-            if not self.message_cache[group_id]:
+            if not group_cache:
                 del self.message_cache[group_id]
                 self.logger.debug(f"群组 {group_id} 缓存为空，已删除")
 
@@ -113,30 +115,19 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         processed_ids_before = len(self.processed_message_ids)
         filtered_ids_before = len(self.filtered_message_ids)
 
-        # 简单地保留最近的1000条处理过的消息ID
-        if len(self.processed_message_ids) > 1000:
-            extra_count = len(self.processed_message_ids) - 1000
-            expired_ids = set(list(self.processed_message_ids)[:extra_count])
-            self.processed_message_ids -= expired_ids
-
+        # 保留最近处理过的 max_processed_ids 条消息ID，按插入顺序淘汰最旧的
+        extra_count = len(self.processed_message_ids) - self.max_processed_ids
+        for _ in range(extra_count):
+            expired_id, _ = self.processed_message_ids.popitem(last=False)
             # 同步清理已过滤的消息ID
-            self.filtered_message_ids = {
-                msg_id for msg_id in self.filtered_message_ids if msg_id in self.processed_message_ids
-            }
-
-        # 清理后的缓存状态
-        cache_stats_after = {
-            "group_count": len(self.message_cache),
-            "message_count": sum(len(queue) for queue in self.message_cache.values()),
-            "processed_ids": len(self.processed_message_ids),
-            "filtered_ids": len(self.filtered_message_ids),
-        }
+            self.filtered_message_ids.discard(expired_id)
 
+        # 清理后的缓存状态直接读取计数写入日志，不再为每次清理单独构建统计字典
         self.logger.debug(
-            f"清理结果: 处理ID从{processed_ids_before}减至{cache_stats_after['processed_ids']}, "
-            f"过滤ID从{filtered_ids_before}减至{cache_stats_after['filtered_ids']}, "
-            f"当前缓存群组数={cache_stats_after['group_count']}, "
-            f"消息数={cache_stats_after['message_count']}"
+            f"清理结果: 处理ID从{processed_ids_before}减至{len(self.processed_message_ids)}, "
+            f"过滤ID从{filtered_ids_before}减至{len(self.filtered_message_ids)}, "
+            f"当前缓存群组数={len(self.message_cache)}, "
+            f"消息数={self._cached_message_count}"
         )
 
     def _calculate_similarity(self, text1: str, text2: str) -> float:
@@ -156,13 +147,16 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         # 增加额外的相似度检查：处理完全包含关系
         # 例如 "666" 和 "6666" 应该被视为相似
         if text1 in text2 or text2 in text1:
-            longer = max(len(text1), len(text2))
-            shorter = min(len(text1), len(text2))
+            # 长度只取一次，用条件表达式代替 min/max 内置函数调用
+            len1, len2 = len(text1), len(text2)
+            longer, shorter = (len1, len2) if len1 >= len2 else (len2, len1)
             if shorter > 0 and shorter >= longer * 0.5:  # 较短的至少是较长的一半长度
                 contained_similarity = shorter / longer
-                similarity = max(similarity, contained_similarity)
+                if contained_similarity > similarity:
+                    similarity = contained_similarity
 
-        self.logger.debug(f"计算相似度: '{text1}' vs '{text2}' = {similarity:.4f}")
+        # 该方法在缓存遍历中被频繁调用，使用 loguru 的参数格式，DEBUG 未启用时不做字符串格式化
+        self.logger.debug("计算相似度: '{}' vs '{}' = {:.4f}", text1, text2, similarity)
         return similarity
 
     def _get_message_content(self, message: MessageBase) -> Optional[str]:
@@ -194,19 +188,22 @@ class SimilarMessageFilterPipeline(MessagePipeline):
                     except:
                         self.logger.warning(f"文本消息内容不是字符串类型且无法转换: {type(content)}")
                         return None
-                self.logger.debug(f"提取到文本消息内容: '{content}'")
+                self.logger.debug("提取到文本消息内容: '{}'", content)
                 return content
             except (AttributeError, TypeError) as e:
                 self.logger.error(f"提取文本消息内容时出错: {e}，消息segment: {message.message_segment}")
                 return None
 
         # 其他类型，暂不处理
-        self.logger.debug(f"不支持的消息类型: {segment_type}，跳过处理")
+        self.logger.debug("不支持的消息类型: {}，跳过处理", segment_type)
         return None
 
     def _should_process_message(self, message: MessageBase) -> bool:
         """
-        判断是否应该处理该消息。
+        判断是否应该处理该消息（仅检查消息类型）。
+
+        调用方 process_message 已检查过消息ID是否处理过，消息内容及其长度也由调用方
+        在提取内容后检查，这里不再重复，避免每条消息重复查找ID和重复提取内容。
 
         Args:
             message: 消息对象
@@ -214,33 +211,18 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         Returns:
             是否应该处理该消息
         """
-        # 检查消息ID是否已处理过
-        if message.message_info.message_id in self.processed_message_ids:
-            self.logger.debug(f"消息ID {message.message_info.message_id} 已处理过，跳过")
-            return False
-
         # 检查消息类型是否在处理列表中
         if not message.message_segment:
             self.logger.debug("消息没有segment部分，跳过处理")
             return False
 
         if message.message_segment.type not in self.message_types:
-            self.logger.debug(f"消息类型 '{message.message_segment.type}' 不在处理列表中，跳过处理")
-            return False
-
-        # 检查消息内容长度是否满足最小长度要求
-        content = self._get_message_content(message)
-        if not content:
-            self.logger.debug("无法提取消息内容，跳过处理")
-            return False
-
-        if len(content) < self.min_message_length:
-            self.logger.debug(f"消息内容长度 {len(content)} 小于最小要求 {self.min_message_length}，跳过处理")
+            self.logger.debug("消息类型 '{}' 不在处理列表中，跳过处理", message.message_segment.type)
             return False
 
         return True
 
-    def _check_similar_messages(self, group_id: str, user_id: str, message_id: str, content: str) -> bool:
+    def _check_similar_messages(self, group_id: str, user_id: str, message_id: str, content: str, now: float) -> bool:
         """
         检查是否有相似消息。如果找到相似消息，就将当前消息标记为需要过滤。
 
@@ -249,30 +231,33 @@ class SimilarMessageFilterPipeline(MessagePipeline):
             user_id: 用户ID
             message_id: 消息ID
             content: 消息内容
+            now: 本次处理消息时读取的当前时间 (time.monotonic())
 
         Returns:
             是否找到了相似消息（并需要过滤当前消息）
         """
         # 标记是否找到相似消息
         found_similar = False
-        now = time.time()
         cutoff_time = now - self.time_window
 
-        self.logger.debug(f"检查消息 '{content}' 是否有相似消息, 群组={group_id}, 用户={user_id}")
+        self.logger.debug("检查消息 '{}' 是否有相似消息, 群组={}, 用户={}", content, group_id, user_id)
 
         # 检查缓存中是否有相似消息
-        if group_id in self.message_cache:
-            cache_size = len(self.message_cache[group_id])
-            self.logger.debug(f"当前群组缓存消息数量: {cache_size}")
-
-            for cached_ts, cached_msg_id, cached_content, cached_user_id in self.message_cache[group_id]:
-                if cached_ts < cutoff_time:
-                    continue  # 跳过过期消息
-
+        # 用 get 一次查找代替 "in 判断 + 下标取值" 的两次哈希查找
+        group_cache = self.message_cache.get(group_id)
+        if group_cache is not None:
+            # 缓存按时间顺序追加 (单调时钟)，过期消息必然集中在队首：直接从队首弹出，
+            # 遇到第一条未过期的消息即停止，之后的消息都在时间窗口内，遍历时无需再逐条判断是否过期
+            while group_cache and group_cache[0][0] < cutoff_time:
+                group_cache.popleft()
+                self._cached_message_count -= 1
+            self.logger.debug("当前群组缓存消息数量: {}", len(group_cache))
+
+            for _, cached_msg_id, cached_content, cached_user_id in group_cache:
                 # 如果不是跨用户过滤且用户不同，则跳过
                 if not self.cross_user_filter and cached_user_id != user_id:
                     self.logger.debug(
-                        f"不允许跨用户过滤，跳过不同用户的消息 (当前用户={user_id}, 缓存用户={cached_user_id})"
+                        "不允许跨用户过滤，跳过不同用户的消息 (当前用户={}, 缓存用户={})", user_id, cached_user_id
                     )
                     continue
 
@@ -302,15 +287,20 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         Returns:
             处理后的消息对象，如果消息被过滤则返回None
         """
+        # 每条消息只读取一次时钟，清理、相似检查与缓存时间戳共用同一个值；
+        # 时间窗口只做时间差计算，使用单调时钟，不受系统时间调整影响
+        now = time.monotonic()
+
         # 清理过期消息
-        self._clean_expired_messages()
+        self._clean_expired_messages(now)
 
         # 尝试记录输入消息的内容（用于调试）
+        # 序列化整条消息开销较大，使用惰性参数，仅在 DEBUG 级别实际输出时才执行 to_dict/json.dumps
         try:
-            message_dict = message.to_dict()
-            message_type = message.message_segment.type if message.message_segment else "unknown"
-            self.logger.debug(
-                f"处理新消息: 类型={message_type}, 内容={json.dumps(message_dict, ensure_ascii=False)[:200]}..."
+            self.logger.opt(lazy=True).debug(
+                "处理新消息: 类型={}, 内容={}...",
+                lambda: message.message_segment.type if message.message_segment else "unknown",
+                lambda: json.dumps(message.to_dict(), ensure_ascii=False)[:200],
             )
         except Exception as e:
             self.logger.warning(f"记录输入消息内容时出错: {e}")
@@ -320,14 +310,14 @@ class SimilarMessageFilterPipeline(MessagePipeline):
 
         # 检查消息是否已处理
         if message_id in self.processed_message_ids:
-            self.logger.debug(f"消息ID {message_id} 已处理过，跳过")
+            self.logger.debug("消息ID {} 已处理过，跳过", message_id)
             # 如果已被过滤，返回None，否则返回原消息
             return None if message_id in self.filtered_message_ids else message
 
         # 如果消息ID已在过滤列表中，直接丢弃
         if message_id in self.filtered_message_ids:
             self.logger.info(f"消息 {message_id} 已被过滤，丢弃")
-            self.processed_message_ids.add(message_id)  # 确保标记为已处理
+            self.processed_message_ids[message_id] = None  # 确保标记为已处理
             return None
 
         # 检查是否应该处理该消息
@@ -341,16 +331,21 @@ class SimilarMessageFilterPipeline(MessagePipeline):
         user_id = "anonymous"
         user_name = "unknown"
 
-        if message.message_info.group_info and message.message_info.group_info.group_id:
-            group_id = message.message_info.group_info.group_id
+        # 每个属性只读取一次，绑定到局部变量后复用
+        message_info = message.message_info
+        group_info = message_info.group_info
+        if group_info and group_info.group_id:
+            group_id = group_info.group_id
 
-        if message.message_info.user_info:
-            if message.message_info.user_info.user_id:
-                user_id = message.message_info.user_info.user_id
-            if hasattr(message.message_info.user_info, "nickname") and message.message_info.user_info.nickname:
-                user_name = message.message_info.user_info.nickname
+        user_info = message_info.user_info
+        if user_info:
+            if user_info.user_id:
+                user_id = user_info.user_id
+            nickname = getattr(user_info, "nickname", None)
+            if nickname:
+                user_name = nickname
 
-        self.logger.debug(f"消息信息: ID={message_id}, 群组={group_id}, 用户={user_id}({user_name})")
+        self.logger.debug("消息信息: ID={}, 群组={}, 用户={}({})", message_id, group_id, user_id, user_name)
 
         # 提取消息内容
         content = self._get_message_content(message)
@@ -358,16 +353,18 @@ class SimilarMessageFilterPipeline(MessagePipeline):
             self.logger.warning(f"无法提取消息内容，返回原消息: {message_id}")
             return message
 
-        self.logger.info(f"处理消息: '{content}', 用户={user_name}, ID={message_id}")
+        # 检查消息内容长度是否满足最小长度要求
+        if len(content) < self.min_message_length:
+            self.logger.debug("消息内容长度 {} 小于最小要求 {}，直接返回原消息", len(content), self.min_message_length)
+            return message
 
-        # 记录当前时间作为消息时间戳
-        timestamp = time.time()
+        self.logger.info(f"处理消息: '{content}', 用户={user_name}, ID={message_id}")
 
         # 标记为已处理
-        self.processed_message_ids.add(message_id)
+        self.processed_message_ids[message_id] = None
 
         # 检查是否有相似消息
-        found_similar = self._check_similar_messages(group_id, user_id, message_id, content)
+        found_similar = self._check_similar_messages(group_id, user_id, message_id, content, now)
 
         if found_similar:
             # 如果找到相似消息，丢弃当前消息
@@ -375,6 +372,7 @@ class SimilarMessageFilterPipeline(MessagePipeline):
             return None
         else:
             # 没有找到相似消息，将当前消息添加到缓存，并返回原始消息
-            self.message_cache[group_id].append((timestamp, message_id, content, user_id))
-            self.logger.debug(f"没有找到相似消息，添加到缓存并返回原始消息: '{content}'")
+            self.message_cache[group_id].append((now, message_id, content, user_id))
+            self._cached_message_count += 1
+            self.logger.debug("没有找到相似消息，添加到缓存并返回原始消息: '{}'", content)
             return message
@@ -35,7 +35,8 @@ class ThrottlePipeline(MessagePipeline):
         self._window_size = self.config.get("window_size", 60)
 
         # 存储时间戳的数据结构
-        self._global_timestamps = deque()  # 全局消息时间戳队列
+        # 全局消息队列，元素为 (时间戳, 用户ID)，按记录顺序排列，队首即最早到期的记录
+        self._global_timestamps = deque()
         self._user_timestamps = defaultdict(deque)  # 用户级别消息时间戳队列
 
         # 并发控制
@@ -86,20 +87,18 @@ class ThrottlePipeline(MessagePipeline):
         清理过期的时间戳记录，保持滑动窗口更新。
 
         Args:
-            current_time: 当前时间戳
+            current_time: 当前时间 (time.monotonic())
         """
         async with self._cleanup_lock:
             # 计算截止时间点
             cutoff_time = current_time - self._window_size
 
-            # 清理全局队列中的过期时间戳
-            while self._global_timestamps and self._global_timestamps[0] < cutoff_time:
-                self._global_timestamps.popleft()
-
-            # 清理各用户队列中的过期时间戳
-            for user_id, timestamps in list(self._user_timestamps.items()):
-                while timestamps and timestamps[0] < cutoff_time:
-                    timestamps.popleft()
+            # 全局队列与各用户队列按相同顺序记录，全局队首过期的记录必然也是对应用户队列的队首，
+            # 因此只需从全局队首弹出已过期的记录并同步弹出用户队列，无需每条消息遍历所有用户
+            while self._global_timestamps and self._global_timestamps[0][0] < cutoff_time:
+                _, user_id = self._global_timestamps.popleft()
+                timestamps = self._user_timestamps[user_id]
+                timestamps.popleft()
 
                 # 优化内存: 如果用户队列为空，则从字典中移除
                 if not timestamps:
@@ -141,9 +140,9 @@ class ThrottlePipeline(MessagePipeline):
 
         Args:
             user_id: 用户ID
-            current_time: 当前时间戳
+            current_time: 当前时间 (time.monotonic())
         """
-        self._global_timestamps.append(current_time)
+        self._global_timestamps.append((current_time, user_id))
         self._user_timestamps[user_id].append(current_time)
 
     async def process_message(self, message: MessageBase) -> Optional[MessageBase]:
@@ -163,7 +162,8 @@ class ThrottlePipeline(MessagePipeline):
             else "unknown_user"
         )
 
-        current_time = time.time()
+        # 滑动窗口只做时间差计算，使用单调时钟，不受系统时间调整 (NTP 校时等) 影响
+        current_time = time.monotonic()
 
         # 清理过期记录
         await self._clean_expired_timestamps(current_time)
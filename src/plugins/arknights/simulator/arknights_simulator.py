@@ -41,6 +41,10 @@ class ArknightsSimulator:
 
     async def _cost_recovery_loop(self):
         """自动回复费用的循环"""
+        # 按绝对截止时间调度，避免每轮的处理耗时累积导致回费节奏逐渐变慢
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while self._is_running:
-            await asyncio.sleep(1)  # 每秒增加1点费用
+            deadline += 1  # 每秒增加1点费用
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
             self.current_cost += 1
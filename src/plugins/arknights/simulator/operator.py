@@ -3,6 +3,9 @@ class Operator:
     干员，表示明日方舟中的可操控角色
     """
 
+    # 干员属性固定，使用 __slots__ 省去每个实例的 __dict__，队伍较大时减少内存占用
+    __slots__ = ("name", "cost", "max_hp", "redeploy_time", "block_count", "profession", "position")
+
     def __init__(
         self,
         name: str,  # 干员名称
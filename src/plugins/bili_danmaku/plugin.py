@@ -3,7 +3,8 @@
 import asyncio
 import time
 import os
-from typing import Dict, Any, Optional, List
+from operator import itemgetter
+from typing import Dict, Any, Optional, List, Tuple
 
 # --- Dependency Check & TOML ---
 try:
@@ -87,6 +88,27 @@ class BiliDanmakuPlugin(BasePlugin):
             if not self.template_items:
                 self.logger.warning("BiliDanmaku 配置启用了 template_info，但在 config.toml 中未找到 template_items。")
 
+        # --- 预先读取每条弹幕都会用到的配置，避免轮询时对每条弹幕重复查找配置字典 ---
+        self._default_user_id: Optional[str] = self.config.get("default_user_id")
+        self._user_cardname: str = self.config.get("user_cardname", "")
+        self._group_info: Optional[GroupInfo] = None
+        if self.config.get("enable_group_info", False):
+            self._group_info = GroupInfo(
+                platform=self.core.platform,
+                group_id=self.config.get("group_id", self.room_id),
+                group_name=self.config.get("group_name", f"bili_{self.room_id}"),
+            )
+        self._format_info = FormatInfo(
+            content_format=self.config.get("content_format", ["text"]),
+            accept_format=self.config.get("accept_format", ["text"]),
+        )
+        self._additional_config_base: Dict[str, Any] = {
+            **self.config.get("additional_config", {}),
+            "source": "bili_danmaku_plugin",
+            "maimcore_reply_probability_gain": 1,
+        }
+        self._use_template_info: bool = bool(self.config.get("enable_template_info", False) and self.template_items)
+
     async def setup(self):
         await super().setup()
         if not self.enabled:
@@ -129,9 +151,11 @@ class BiliDanmakuPlugin(BasePlugin):
     async def _run_polling_loop(self):
         """后台轮询循环"""
         while not self._stop_event.is_set():
-            await self._fetch_and_process()
+            backoff = await self._fetch_and_process()
+            # 请求被拒绝时延长等待，避免在 IP 被临时阻止时快速重试
+            delay = self.poll_interval * 3 if backoff else self.poll_interval
             try:
-                await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_interval)
+                await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
                 break
             except asyncio.TimeoutError:
                 pass  # 正常超时，继续循环
@@ -140,12 +164,12 @@ class BiliDanmakuPlugin(BasePlugin):
                 break
         self.logger.info("弹幕轮询循环已结束。")
 
-    async def _fetch_and_process(self):
-        """获取并处理弹幕"""
+    async def _fetch_and_process(self) -> bool:
+        """获取并处理弹幕。返回 True 表示下次轮询前需要退避等待。"""
         if not self._session or self._session.closed:
             self.logger.warning("aiohttp session 未初始化或已关闭，跳过本次轮询。")
             # 可以在这里尝试重新创建 session，但更健壮的做法是在 setup 失败时禁用插件
-            return
+            return False
 
         new_max_timestamp = self._latest_timestamp
         try:
@@ -154,9 +178,8 @@ class BiliDanmakuPlugin(BasePlugin):
                 # Bilibili API 即使出错也可能返回 200 OK，需要检查内容
                 if response.status != 200:
                     self.logger.warning(f"Bilibili API 请求失败，状态码: {response.status}")
-                    # 增加一点等待时间，避免在 IP 被临时阻止时快速重试
-                    await asyncio.sleep(self.poll_interval * 2)
-                    return
+                    # 退避交给轮询循环：不在持有响应连接时休眠，且等待期间仍可被停止信号打断
+                    return True
 
                 data = await response.json()
                 self.logger.debug(f"收到 API 响应: code={data.get('code')}")
@@ -165,25 +188,27 @@ class BiliDanmakuPlugin(BasePlugin):
                     room_data = data.get("data", {}).get("room", [])
                     if not room_data:
                         self.logger.debug("API 返回的弹幕列表为空")
-                        return
+                        return False
 
-                    new_danmakus = []
+                    # 每条弹幕的时间戳只解析一次，排序和构建消息时复用
+                    new_danmakus: List[Tuple[float, Dict[str, Any]]] = []
+                    latest_timestamp = self._latest_timestamp
                     for item in room_data:
                         # B站时间戳是秒级整数
-                        timestamp = item.get("check_info", {}).get("ts")
-                        # 尝试获取用户ID (uid)
-                        uid = item.get("uid")
+                        check_info = item.get("check_info")
+                        timestamp = check_info.get("ts") if check_info else None
 
-                        if timestamp and timestamp > self._latest_timestamp:
-                            new_danmakus.append(item)
-                            new_max_timestamp = max(new_max_timestamp, timestamp)
+                        if timestamp and timestamp > latest_timestamp:
+                            new_danmakus.append((timestamp, item))
+                            if timestamp > new_max_timestamp:
+                                new_max_timestamp = timestamp
 
                     if new_danmakus:
-                        new_danmakus.sort(key=lambda x: x.get("check_info", {}).get("ts", 0))
+                        new_danmakus.sort(key=itemgetter(0))
                         self.logger.info(f"收到 {len(new_danmakus)} 条新弹幕")
-                        for item in new_danmakus:
+                        for timestamp, item in new_danmakus:
                             try:
-                                message = await self._create_danmaku_message(item)
+                                message = await self._create_danmaku_message(item, timestamp)
                                 if message:
                                     await self.core.send_to_maicore(message)
                             except Exception as e:
@@ -207,53 +232,40 @@ class BiliDanmakuPlugin(BasePlugin):
         except Exception as e:
             # 捕获更广泛的异常，例如 JSON 解码错误
             self.logger.exception(f"处理 Bilibili 弹幕时发生未知错误: {e}")  # 使用 exception 记录 traceback
+        return False
 
-    async def _create_danmaku_message(self, item: Dict[str, Any]) -> Optional[MessageBase]:
-        """根据弹幕数据和配置创建 MessageBase 对象"""
+    async def _create_danmaku_message(
+        self, item: Dict[str, Any], timestamp: Optional[float] = None
+    ) -> Optional[MessageBase]:
+        """根据弹幕数据和配置创建 MessageBase 对象。timestamp 为调用方已解析出的弹幕时间戳。"""
         text = item.get("text", "")
         nickname = item.get("nickname", "未知用户")
-        timestamp = item.get("check_info", {}).get("ts", time.time())
+        if timestamp is None:
+            check_info = item.get("check_info")
+            timestamp = (check_info.get("ts") if check_info else None) or time.time()
 
-        # 直接从 self.config 获取默认 user_id
-        user_id = item.get("uid") or self.config.get("default_user_id", f"bili_{nickname}")
+        # 未提供 uid 时使用配置的默认 user_id
+        user_id = item.get("uid") or self._default_user_id or f"bili_{nickname}"
 
         if not text:  # 忽略空弹幕
             return None
 
-        # --- User Info --- (使用 self.config 获取配置)
+        # --- User Info --- (cardname 来自预先读取的配置)
         user_info = UserInfo(
             platform=self.core.platform,
             user_id=str(user_id),
             user_nickname=nickname,
-            user_cardname=self.config.get("user_cardname", ""),
-        )
-
-        # --- Group Info (Conditional) --- (使用 self.config 获取配置)
-        group_info: Optional[GroupInfo] = None
-        if self.config.get("enable_group_info", False):
-            group_info = GroupInfo(
-                platform=self.core.platform,
-                group_id=self.config.get("group_id", self.room_id),
-                group_name=self.config.get("group_name", f"bili_{self.room_id}"),
-            )
-
-        # --- Format Info --- (使用 self.config 获取配置)
-        format_info = FormatInfo(
-            content_format=self.config.get("content_format", ["text"]),
-            accept_format=self.config.get("accept_format", ["text"]),
+            user_cardname=self._user_cardname,
         )
 
-        # --- Additional Config --- (使用 self.config 获取配置)
-        additional_config = self.config.get("additional_config", {}).copy()
-        # 保留或移动到 config
-        additional_config["source"] = "bili_danmaku_plugin"
+        # --- Additional Config --- (复制预先构建的基础字典，再填入每条弹幕的字段)
+        additional_config = dict(self._additional_config_base)
         additional_config["sender_name"] = nickname
         additional_config["bili_uid"] = str(user_id) if item.get("uid") else None
-        additional_config["maimcore_reply_probability_gain"] = 1
 
         # --- Template Info (Conditional & Modification) --- Aligning with ConsoleInput ---
         final_template_info_value = None
-        if self.config.get("enable_template_info", False) and self.template_items:
+        if self._use_template_info:
             # 1. 获取原始模板项 (创建副本)
             modified_template_items = (self.template_items or {}).copy()
 
@@ -287,9 +299,9 @@ class BiliDanmakuPlugin(BasePlugin):
             message_id=f"bili_{self.room_id}_{int(timestamp)}_{hash(text + str(user_id)) % 10000}",
             time=int(timestamp),
             user_info=user_info,
-            group_info=group_info,
+            group_info=self._group_info,
             template_info=final_template_info_value,  # Use the potentially modified dict
-            format_info=format_info,
+            format_info=self._format_info,
             additional_config=additional_config,
         )
 
@@ -84,8 +84,10 @@ class CommandProcessorPlugin(BasePlugin):
         if not self.enabled:
             return
 
-        # 注册通配符处理器以处理所有来自 MaiCore 的传入消息
-        # 重要: 假设此处理器在特定处理器（如 TTS）之前运行。
+        # 注册通配符处理器以处理所有来自 MaiCore 的传入消息，非文本消息在 process_message 开头直接返回。
+        # 重要: 假设此处理器在其他通配符处理器（如 TTS）之前运行。
+        # AmaidesuCore 先执行类型处理器 (如 Minecraft 的 'text')、再执行通配符处理器，
+        # 因此类型处理器总是看到未移除指令标签的原始文本。
         # 未来可能需要在 AmaidesuCore 中加入优先级系统。
         self.core.register_websocket_handler("*", self.process_message)
         self.logger.info("CommandProcessorPlugin 已注册为通配符消息处理器。")
@@ -100,21 +102,28 @@ class CommandProcessorPlugin(BasePlugin):
         处理传入消息以查找、执行和移除命令标签。
         直接修改 message.message_segment.data。
         """
-        if not self.enabled or not self.command_pattern:
-            return  # 如果禁用或模式无效则不执行任何操作
-
-        # 仅处理文本消息
+        # 仅处理文本消息：作为通配符处理器会收到所有类型的消息，先做最便宜的类型检查
         if not message.message_segment or message.message_segment.type != "text":
             return
 
+        if not self.enabled or not self.command_pattern:
+            return  # 如果禁用或模式无效则不执行任何操作
+
         original_text = message.message_segment.data
         if not isinstance(original_text, str):
             # 对于文本段，应该不会发生这种情况，但检查一下比较好
             self.logger.warning(f"文本段预期为字符串数据，但得到 {type(original_text)}。跳过命令处理。")
             return
 
-        processed_text = original_text
-        commands_found = self.command_pattern.findall(original_text)
+        # 单次扫描：在 sub 的回调中收集指令内容，同时得到移除指令标签后的文本，
+        # 取代先 findall 再 sub 的两次正则扫描
+        commands_found = []
+
+        def _collect_command(match: re.Match) -> str:
+            commands_found.append(match.group(1) if match.re.groups else match.group(0))
+            return ""
+
+        processed_text = self.command_pattern.sub(_collect_command, original_text).strip()
 
         if not commands_found:
             return  # 未找到命令，无需执行任何操作
@@ -132,16 +141,17 @@ class CommandProcessorPlugin(BasePlugin):
             command_name = parts[0]
             args_str = parts[1] if len(parts) > 1 else ""
 
-            if command_name in self.command_map:
-                command_config = self.command_map[command_name]
+            command_config = self.command_map.get(command_name)
+            if command_config is not None:
                 service_name = command_config["service"]
                 method_name = command_config["method"]
 
                 service_instance = self.core.get_service(service_name)
 
                 if service_instance:
-                    if hasattr(service_instance, method_name):
-                        method_to_call = getattr(service_instance, method_name)
+                    # 鸭子类型：一次 getattr 取得方法，替代 hasattr + getattr 两次属性查找
+                    method_to_call = getattr(service_instance, method_name, None)
+                    if method_to_call is not None:
                         if asyncio.iscoroutinefunction(method_to_call):
                             # 基本参数解析 (按逗号分割，去除空白)
                             # 对于复杂参数可能需要更健壮的解析
@@ -164,11 +174,7 @@ class CommandProcessorPlugin(BasePlugin):
             else:
                 self.logger.warning(f"发现未知指令: '{command_name}'")
 
-        # 从文本中移除所有命令标签
-        # 我们使用带有原始模式的 re.sub
-        processed_text = self.command_pattern.sub("", original_text).strip()
-
-        # 直接修改消息段数据
+        # 直接修改消息段数据 (指令标签已在上面的单次扫描中移除)
         if processed_text != original_text:
             self.logger.debug(f"原始文本: '{original_text}'")
             self.logger.info(f"处理后文本 (指令已移除): '{processed_text}'")
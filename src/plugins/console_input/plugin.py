@@ -105,6 +105,31 @@ class ConsoleInputPlugin(BasePlugin):
             if not self.template_items:
                 self.logger.warning("配置启用了 template_info，但在 message_config 中未找到 template_items。")
 
+        # --- 预先构建每条消息共享的静态字段，避免每条输入重复创建 ---
+        cfg = self.message_config
+        self._user_info = UserInfo(
+            platform=self.core.platform,
+            user_id=cfg.get("user_id", 0),  # Assume int from config, default to 0
+            user_nickname=cfg.get("user_nickname", "ConsoleUser"),
+            user_cardname=cfg.get("user_cardname", ""),
+        )
+        self._group_info: Optional[GroupInfo] = None
+        if cfg.get("enable_group_info", False):
+            self._group_info = GroupInfo(
+                platform=self.core.platform,
+                group_id=cfg.get("group_id", 0),
+                group_name=cfg.get("group_name", "default"),
+            )
+        self._format_info = FormatInfo(
+            content_format=cfg.get("content_format", ["text"]), accept_format=cfg.get("accept_format", ["text"])
+        )
+        self._additional_config_base: Dict[str, Any] = {
+            **cfg.get("additional_config", {}),
+            "source": "console_input_plugin",
+            "sender_name": self._user_info.user_nickname,
+            "maimcore_reply_probability_gain": 1,
+        }
+
         self._input_task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
 
@@ -177,29 +202,6 @@ class ConsoleInputPlugin(BasePlugin):
         timestamp = time.time()
         cfg = self.message_config  # Use the loaded message config
 
-        # --- User Info ---
-        user_id_from_config = cfg.get("user_id", 0)  # Assume int from config, default to 0
-        user_info = UserInfo(
-            platform=self.core.platform,
-            user_id=user_id_from_config,
-            user_nickname=cfg.get("user_nickname", "ConsoleUser"),
-            user_cardname=cfg.get("user_cardname", ""),
-        )
-
-        # --- Group Info (Conditional) ---
-        group_info: Optional[GroupInfo] = None
-        if cfg.get("enable_group_info", False):
-            group_info = GroupInfo(
-                platform=self.core.platform,
-                group_id=cfg.get("group_id", 0),
-                group_name=cfg.get("group_name", "default"),
-            )
-
-        # --- Format Info ---
-        format_info = FormatInfo(
-            content_format=cfg.get("content_format", ["text"]), accept_format=cfg.get("accept_format", ["text"])
-        )
-
         # --- Template Info (Conditional & Modification) ---
         final_template_info_value = None
         if cfg.get("enable_template_info", False) and self.template_items:
@@ -230,10 +232,8 @@ class ConsoleInputPlugin(BasePlugin):
         # else: # 不需要模板或模板项为空时，final_template_info_value 保持 None
 
         # --- Additional Config ---
-        additional_config = cfg.get("additional_config", {})
-        additional_config["source"] = "console_input_plugin"
-        additional_config["sender_name"] = user_info.user_nickname
-        additional_config["maimcore_reply_probability_gain"] = 1
+        # 复制预先构建的基础字典，避免下游修改影响后续消息
+        additional_config = dict(self._additional_config_base)
 
         # --- Base Message Info ---
         message_info = BaseMessageInfo(
@@ -241,11 +241,11 @@ class ConsoleInputPlugin(BasePlugin):
             # Consider casting time to int for consistency, but optional for now
             message_id=f"console_{int(timestamp * 1000)}_{hash(text) % 10000}",
             time=timestamp,
-            user_info=user_info,
-            group_info=group_info,
+            user_info=self._user_info,
+            group_info=self._group_info,
             # 使用可能已修改的 template_info
             template_info=final_template_info_value,
-            format_info=format_info,
+            format_info=self._format_info,
             additional_config=additional_config,
         )
 
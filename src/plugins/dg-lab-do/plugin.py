@@ -4,7 +4,7 @@ import asyncio
 import tomllib
 import os
 import time  # 引入 time 模块 (虽然在修改后的代码中没直接用，但可能其他地方会用到)
-from typing import Any, Dict, Optional
+from typing import Any, Coroutine, Dict, Optional, Set
 
 # 导入全局logger - 在确认不再需要后移除
 # from src.utils.logger import logger # 将在确认后移除
@@ -60,6 +60,8 @@ class ElectricityMonitorPlugin(BasePlugin):
         # self.config = loaded_config.get("electricity_monitor", {})
         self.config = self.plugin_config  # 直接使用注入的 plugin_config
         self.enabled = self.config.get("enabled", True)
+        # 插件创建的所有后台任务，清理时统一取消并等待
+        self._background_tasks: Set[asyncio.Task] = set()
 
         # --- 检查依赖 ---
         if aiohttp is None:
@@ -110,7 +112,14 @@ class ElectricityMonitorPlugin(BasePlugin):
 
         # --- 启动后台任务来注册 Prompt 上下文 ---
         # 这样做可以避免阻塞 setup，并在服务可用时进行注册
-        asyncio.create_task(self._register_context_when_ready())
+        self._spawn(self._register_context_when_ready(), name="DGLab_RegisterContext")
+
+    def _spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """创建后台任务并加入任务组，任务结束后自动移出。"""
+        task = asyncio.create_task(coro, name=name)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
 
     async def _register_context_when_ready(self):
         """后台任务：等待 PromptContext 服务可用后注册上下文。"""
@@ -159,6 +168,13 @@ class ElectricityMonitorPlugin(BasePlugin):
 
     async def cleanup(self):
         self.logger.info("正在清理 ElectricityMonitorPlugin...")  # logger 已是 self.logger
+        # 统一取消所有后台任务并一次性等待（控制任务被取消时仍会在 finally 中发送强度归零命令）
+        if self._background_tasks:
+            tasks = list(self._background_tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
         # 关闭 aiohttp Session
         if self.http_session:
             await self.http_session.close()
@@ -208,7 +224,7 @@ class ElectricityMonitorPlugin(BasePlugin):
                 if not self.control_lock.locked():
                     async with self.control_lock:
                         # 创建异步任务执行控制命令，不阻塞当前消息处理
-                        asyncio.create_task(self._send_control_commands(text_content))
+                        self._spawn(self._send_control_commands(text_content), name="DGLab_Control")
                         # 添加短暂延迟防止因单条消息内多个关键词导致锁争用 (可选)
                         # await asyncio.sleep(0.1)
                 else:
@@ -264,37 +280,43 @@ class ElectricityMonitorPlugin(BasePlugin):
             )
         )
 
-        # --- 并发执行初始 API 调用 ---
-        results = await asyncio.gather(*initial_tasks, return_exceptions=True)
-
-        # --- 检查初始调用结果 ---
-        initial_success_count = 0
-        tasks_descriptions = [  # 手动创建描述列表，因为从 task 获取描述困难
-            f"设置通道 A 强度为 {self.target_strength}",
-            f"设置通道 B 强度为 {self.target_strength}",
-            f"设置通道 A 波形为 '{self.target_waveform}'",
-            f"设置通道 B 波形为 '{self.target_waveform}'",
-        ]
-        for i, result in enumerate(results):
-            desc = tasks_descriptions[i]
-            if isinstance(result, Exception):
-                self.logger.error(f"初始命令 '{desc}' 执行失败: {result}")
-            elif result is False:  # _make_api_call 返回 False 表示 API 调用失败
-                pass  # 失败日志已在 _make_api_call 中记录
-            else:  # result is True
-                initial_success_count += 1
-
-        if initial_success_count < 4:
-            self.logger.warning(
-                f"初始控制命令发送完成，但有 {4 - initial_success_count} 个失败。仍将尝试在延迟后归零强度。"
-            )
-        else:
-            self.logger.info(f"所有 4 个初始控制命令已成功发送。")
+        # 从发出初始命令起，无论正常结束还是任务被取消（如插件清理），都保证最后将强度归零
+        try:
+            # --- 并发执行初始 API 调用 ---
+            results = await asyncio.gather(*initial_tasks, return_exceptions=True)
+
+            # --- 检查初始调用结果 ---
+            initial_success_count = 0
+            tasks_descriptions = [  # 手动创建描述列表，因为从 task 获取描述困难
+                f"设置通道 A 强度为 {self.target_strength}",
+                f"设置通道 B 强度为 {self.target_strength}",
+                f"设置通道 A 波形为 '{self.target_waveform}'",
+                f"设置通道 B 波形为 '{self.target_waveform}'",
+            ]
+            for i, result in enumerate(results):
+                desc = tasks_descriptions[i]
+                if isinstance(result, Exception):
+                    self.logger.error(f"初始命令 '{desc}' 执行失败: {result}")
+                elif result is False:  # _make_api_call 返回 False 表示 API 调用失败
+                    pass  # 失败日志已在 _make_api_call 中记录
+                else:  # result is True
+                    initial_success_count += 1
+
+            if initial_success_count < 4:
+                self.logger.warning(
+                    f"初始控制命令发送完成，但有 {4 - initial_success_count} 个失败。仍将尝试在延迟后归零强度。"
+                )
+            else:
+                self.logger.info(f"所有 4 个初始控制命令已成功发送。")
 
-        # --- 等待并发送强度归零命令 ---
-        self.logger.info("等待 2 秒后将强度归零...")
-        await asyncio.sleep(2)
+            # --- 等待并发送强度归零命令 ---
+            self.logger.info("等待 2 秒后将强度归零...")
+            await asyncio.sleep(2)
+        finally:
+            await self._reset_strength(strength_url, headers)
 
+    async def _reset_strength(self, strength_url: str, headers: Dict):
+        """将两个通道的强度归零。"""
         reset_tasks = []
         self.logger.info("准备发送强度归零命令...")
         # 设置通道 A 强度为 0
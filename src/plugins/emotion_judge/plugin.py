@@ -39,6 +39,13 @@ from src.core.amaidesu_core import AmaidesuCore
 #         return {}
 
 
+# 未配置 model.system_prompt 时使用的默认系统提示词，热键列表会拼接在其后
+DEFAULT_SYSTEM_PROMPT = (
+    "你是一个主播的助手，根据主播的文本内容，判断主播的情感状态，确定触发哪一个Live2D热键以帮助主播更好地表达情感。"
+    "只输出热键名称，不要包含其他任何文字或解释。以下为热键列表：\\n"
+)
+
+
 # --- Plugin Class ---
 class EmotionJudgePlugin(BasePlugin):
     """
@@ -54,15 +61,31 @@ class EmotionJudgePlugin(BasePlugin):
         self.config = self.plugin_config  # 直接使用注入的 plugin_config
         self.enabled = self.config.get("enabled", True)
         self.model = self.config.get("model", {})
+        # 模型参数在初始化时解析一次，避免每次判断都重新查配置
+        self.model_name = self.model.get("name", "Qwen/Qwen2.5-7B-Instruct")
+        self.system_prompt = self.model.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+        self.max_tokens = self.model.get("max_tokens", 10)
+        self.temperature = self.model.get("temperature", 0.3)
         self.base_url = self.config.get("base_url", "https://api.siliconflow.cn/v1/")
         self.api_key = self.config.get("api_key", "")
         # 添加冷却时间配置和上次触发时间记录
         self.cool_down_seconds = self.config.get("cool_down_seconds", 5)  # 从配置读取冷却时间，默认为 5 秒
         self.last_trigger_time: float = 0.0  # 初始化上次触发时间
+        # 拼接好热键列表的系统提示词，及其所依据的热键列表对象。VTS 插件会缓存热键列表，
+        # 列表对象不变时直接复用上次拼接的结果，无需每次判断都重新提取名称和拼接字符串
+        self._hotkey_list_source: Optional[Any] = None
+        self._system_content: str = ""
 
         # 初始化 OpenAI 客户端
         self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
 
+        # 消息段类型 -> 处理方法 的分发表。本插件注册为通配符处理器，
+        # 不在表中的消息段类型一次字典查找即可跳过，无需逐个比较类型
+        self._segment_handlers = {
+            "text": self._handle_text,
+            "seglist": self._handle_seglist,
+        }
+
         # self.logger.info("EmotionJudgePlugin initialized.") # 基类已有通用初始化日志
 
     async def setup(self):
@@ -90,42 +113,39 @@ class EmotionJudgePlugin(BasePlugin):
 
     async def handle_maicore_message(self, message: MessageBase):
         """处理从 MaiCore 收到的消息，如果是文本类型，则进行处理，触发热键。"""
+        # 通配符处理器会收到所有消息，先按消息段类型查分发表快速过滤，再做冷却检查
+        segment = message.message_segment
+        segment_handler = self._segment_handlers.get(segment.type) if segment else None
+        if segment_handler is None:
+            return
+
         # --- 将冷却时间检查移到此处 ---
         current_time = time.monotonic()
         if current_time - self.last_trigger_time < self.cool_down_seconds:
             remaining_cooldown = self.cool_down_seconds - (current_time - self.last_trigger_time)
-            self.logger.debug(f"情感判断冷却中，跳过消息处理。剩余 {remaining_cooldown:.1f} 秒")
+            self.logger.debug("情感判断冷却中，跳过消息处理。剩余 {:.1f} 秒", remaining_cooldown)
             return
         # --- 冷却时间检查结束 ---
 
-        if message.message_segment and message.message_segment.type == "text":
-            original_text = message.message_segment.data
-            if not isinstance(original_text, str) or not original_text.strip():
-                self.logger.debug("收到非字符串或空文本消息段，跳过")
-                return
+        await segment_handler(segment.data)
 
-            self.logger.info(f"收到文本消息: '{original_text[:50]}...'")
+    async def _handle_text(self, original_text: Any):
+        """处理 text 消息段数据"""
+        if not isinstance(original_text, str) or not original_text.strip():
+            self.logger.debug("收到非字符串或空文本消息段，跳过")
+            return
 
-            await self._judge_and_trigger(original_text)
-        elif message.message_segment and message.message_segment.type == "seglist":
-            # 递归处理 seglist
-            await self._handle_seglist(message.message_segment.data)
+        self.logger.info(f"收到文本消息: '{original_text[:50]}...'")
+        await self._judge_and_trigger(original_text)
 
     async def _handle_seglist(self, seg_list: list):
-        """递归处理 seglist 数据"""
+        """递归处理 seglist 数据，嵌套的 seglist 通过分发表递归回到本方法"""
         for seg in seg_list:
-            if seg.type == "text":
-                original_text = seg.data
-                if isinstance(original_text, str) and original_text.strip():
-                    self.logger.info(f"从 seglist 中提取文本: '{original_text[:50]}...'")
-                    await self._judge_and_trigger(original_text)
-                else:
-                    self.logger.debug("从 seglist 中收到非字符串或空文本消息段，跳过")
-            elif seg.type == "seglist":
-                self.logger.debug("在 seglist 中发现嵌套 seglist，递归处理...")
-                await self._handle_seglist(seg.data)  # 递归调用
-            else:
+            segment_handler = self._segment_handlers.get(seg.type)
+            if segment_handler is None:
                 self.logger.warning(f"在 seglist 中遇到不支持的段类型 '{seg.type}'，跳过")
+                continue
+            await segment_handler(seg.data)
 
     async def _judge_and_trigger(self, text: str) -> Optional[str]:
         """使用 LLM 判断文本的情感。"""
@@ -139,30 +159,23 @@ class EmotionJudgePlugin(BasePlugin):
             self.logger.warning("无法获取热键列表，跳过情感判断。")
             return None
 
-        hotkey_name_list = []
-        for hotkey in hotkey_list:
-            hotkey_name_list.append(hotkey["name"])
-        self.logger.debug(f"获取到的热键列表: {hotkey_name_list}")
+        if hotkey_list is not self._hotkey_list_source:
+            hotkey_name_list = [hotkey["name"] for hotkey in hotkey_list]
+            self.logger.debug(f"获取到的热键列表: {hotkey_name_list}")
 
-        # 将热键列表转换为字符串，以便拼接到 prompt 中
-        hotkey_list_str = "\\n".join(hotkey_name_list)  # 使用换行符分隔
+            # 将热键列表转换为字符串，拼接到 prompt 中
+            self._system_content = self.system_prompt + "\\n".join(hotkey_name_list)  # 使用换行符分隔
+            self._hotkey_list_source = hotkey_list
 
         try:
             response = await self.client.chat.completions.create(
-                model=self.model.get("name", "Qwen/Qwen2.5-7B-Instruct"),
+                model=self.model_name,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": self.model.get(
-                            "system_prompt",
-                            "你是一个主播的助手，根据主播的文本内容，判断主播的情感状态，确定触发哪一个Live2D热键以帮助主播更好地表达情感。只输出热键名称，不要包含其他任何文字或解释。以下为热键列表：\\n",
-                        )
-                        + hotkey_list_str,
-                    },
+                    {"role": "system", "content": self._system_content},
                     {"role": "user", "content": text},
                 ],
-                max_tokens=self.model.get("max_tokens", 10),
-                temperature=self.model.get("temperature", 0.3),
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
             )
 
             if response.choices and response.choices[0].message:
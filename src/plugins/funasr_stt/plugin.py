@@ -36,6 +36,9 @@ from src.core.plugin_manager import BasePlugin
 from src.core.amaidesu_core import AmaidesuCore
 from maim_message import MessageBase, BaseMessageInfo, UserInfo, GroupInfo, Seg, FormatInfo
 
+# 每轮循环最多一次性取出的积压音频块数量 (取出后仍逐块处理)
+MAX_DRAIN_CHUNKS = 8
+
 
 class FunASRPlugin(BasePlugin):
     """使用 FunASR API 进行语音识别的插件。"""
@@ -85,6 +88,15 @@ class FunASRPlugin(BasePlugin):
         self.window_samples = int(self.sample_window * self.sample_rate)
         self.block_size_samples = self.window_samples
 
+        # --- Audio Queue Config ---
+        # 音频队列上限及溢出策略：drop_oldest 丢弃最旧的音频块以保证实时性，drop_newest 丢弃新到的音频块
+        self.max_pending_chunks = max(1, int(self.audio_config.get("max_pending_chunks", 1024)))
+        self.overflow_policy = self.audio_config.get("overflow_policy", "drop_oldest")
+        if self.overflow_policy not in ("drop_oldest", "drop_newest"):
+            self.logger.warning(f"未知的 overflow_policy '{self.overflow_policy}'，将使用 drop_oldest。")
+            self.overflow_policy = "drop_oldest"
+        self.dropped_chunks = 0
+
         # --- Context Tags ---
         self.context_tags: Optional[List[str]] = self.message_config.get("context_tags")
         if not isinstance(self.context_tags, list):
@@ -104,12 +116,38 @@ class FunASRPlugin(BasePlugin):
             if not self.template_items:
                 self.logger.warning("配置启用了 template_info，但未找到 template_items。")
 
+        # --- 预先构建每条消息共享的静态字段，运行期间不会变化，避免每次识别结果都重复创建 ---
+        cfg = self.message_config
+        self._user_info = UserInfo(
+            platform=self.core.platform,
+            user_id=cfg.get("user_id", 0),
+            user_nickname=cfg.get("user_nickname", "语音"),
+            user_cardname=cfg.get("user_cardname", ""),
+        )
+        self._group_info: Optional[GroupInfo] = None
+        if cfg.get("enable_group_info", True):
+            self._group_info = GroupInfo(
+                platform=self.core.platform,
+                group_id=cfg.get("group_id", 0),
+                group_name=cfg.get("group_name", "funasr_default"),
+            )
+        self._format_info = FormatInfo(
+            content_format=cfg.get("content_format", ["text"]),
+            accept_format=cfg.get("accept_format", ["text", "vts_command"]),
+        )
+        self._additional_config_base: Dict[str, Any] = {
+            **cfg.get("additional_config", {}),
+            "source": "funasr_plugin",
+            "sender_name": self._user_info.user_nickname,
+        }
+
     def _find_device_index(self, device_name: Optional[str], kind: str = "input") -> Optional[int]:
         """根据设备名称查找设备索引。"""
         if sd is None:
             self.logger.error("sounddevice 库不可用。")
             return None
         try:
+            # 设备列表只查询一次，默认设备的信息也从中直接读取，不再单独向 PortAudio 查询
             devices = sd.query_devices()
             if device_name:
                 for i, device in enumerate(devices):
@@ -122,7 +160,7 @@ class FunASRPlugin(BasePlugin):
             if default_index == -1:
                 self.logger.warning(f"未找到默认 {kind} 设备。将尝试使用 None (由 sounddevice 选择)。")
                 return None
-            self.logger.info(f"使用默认 {kind} 设备索引: {default_index} ({sd.query_devices(default_index)['name']})")
+            self.logger.info(f"使用默认 {kind} 设备索引: {default_index} ({devices[default_index]['name']})")
             return default_index
         except Exception as e:
             self.logger.error(f"查找音频设备时出错: {e}", exc_info=True)
@@ -193,7 +231,7 @@ class FunASRPlugin(BasePlugin):
                         self.logger.info("FunASR 识别结果为 'none'，跳过发送。")
                         continue
                     message_to_send = await self._create_stt_message(final_text)
-                    self.logger.debug(f"准备发送 STT 消息对象: {repr(message_to_send)}")
+                    self.logger.debug("准备发送 STT 消息对象: {!r}", message_to_send)
                     await self.core.send_to_maicore(message_to_send)
                 elif result:
                     self.logger.warning(f"FunASR 流产生警告/错误: {result}")
@@ -206,35 +244,10 @@ class FunASRPlugin(BasePlugin):
     async def _create_stt_message(self, text: str) -> MessageBase:
         """使用配置创建 MessageBase 对象。"""
         timestamp = time.time()
-        cfg = self.message_config
-
-        # --- User Info ---
-        user_id_from_config = cfg.get("user_id", 0)
-        user_info = UserInfo(
-            platform=self.core.platform,
-            user_id=user_id_from_config,
-            user_nickname=cfg.get("user_nickname", "语音"),
-            user_cardname=cfg.get("user_cardname", ""),
-        )
-
-        # --- Group Info ---
-        group_info: Optional[GroupInfo] = None
-        if cfg.get("enable_group_info", True):
-            group_info = GroupInfo(
-                platform=self.core.platform,
-                group_id=cfg.get("group_id", 0),
-                group_name=cfg.get("group_name", "funasr_default"),
-            )
-
-        # --- Format Info ---
-        format_info = FormatInfo(
-            content_format=cfg.get("content_format", ["text"]),
-            accept_format=cfg.get("accept_format", ["text", "vts_command"]),
-        )
 
         # --- Template Info ---
         final_template_info_value = None
-        if cfg.get("enable_template_info", False) and self.template_items:
+        if self.template_items:
             modified_template_items = self.template_items.copy()
             additional_context = ""
             prompt_ctx_service = self.core.get_service("prompt_context")
@@ -254,20 +267,18 @@ class FunASRPlugin(BasePlugin):
 
             final_template_info_value = {"template_items": modified_template_items}
 
-        # --- Additional Config ---
-        additional_config = cfg.get("additional_config", {}).copy()
-        additional_config["source"] = "funasr_plugin"
-        additional_config["sender_name"] = user_info.user_nickname
+        # --- Additional Config (复制一份，避免下游修改影响共享的基础配置) ---
+        additional_config = dict(self._additional_config_base)
 
         # --- Base Message Info ---
         message_info = BaseMessageInfo(
             platform=self.core.platform,
             message_id=f"funasr_{int(timestamp * 1000)}_{hash(text) % 10000}",
             time=int(timestamp),
-            user_info=user_info,
-            group_info=group_info,
+            user_info=self._user_info,
+            group_info=self._group_info,
             template_info=final_template_info_value,
-            format_info=format_info,
+            format_info=self._format_info,
             additional_config=additional_config,
         )
 
@@ -282,20 +293,36 @@ class FunASRPlugin(BasePlugin):
     async def transcribe_stream(self) -> AsyncGenerator[str, None]:
         """捕获音频流，执行简单 VAD，发送到 FunASR，返回结果。"""
         loop = asyncio.get_event_loop()
-        q = asyncio.Queue(maxsize=10000)
-        audio_buffer = []
+        q = asyncio.Queue(maxsize=self.max_pending_chunks)
+        # 音频数据已实时发送给 FunASR，本地只需统计当前语音段的采样数，用于 max_record_seconds 判断；
+        # 不再把每块音频转换为 Python 浮点列表累积起来 (每个采样一个对象，且随录音时长无限增长)
+        recorded_samples = 0
         is_recording = False
         silence_counter = 0
         max_samples = int(self.max_record_seconds * self.sample_rate)
         silence_samples = int(self.silence_duration * self.sample_rate)
 
+        def enqueue_chunk(chunk: np.ndarray):
+            # 在事件循环线程中执行，队列满时按溢出策略丢弃数据，避免积压无限增长
+            try:
+                q.put_nowait(chunk)
+                return
+            except asyncio.QueueFull:
+                pass
+            if self.overflow_policy == "drop_oldest":
+                try:
+                    q.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                q.put_nowait(chunk)
+            self.dropped_chunks += 1
+            if self.dropped_chunks == 1 or self.dropped_chunks % 100 == 0:
+                self.logger.warning(f"音频队列已满！已丢弃 {self.dropped_chunks} 个音频块 ({self.overflow_policy})。")
+
         def callback(indata: np.ndarray, frame_count: int, time_info: Any, status: "sd.CallbackFlags"):
             if status:
                 self.logger.warning(f"音频输入状态: {status}")
-            try:
-                loop.call_soon_threadsafe(q.put_nowait, indata.copy())
-            except asyncio.QueueFull:
-                self.logger.warning("音频队列已满！丢弃数据。")
+            loop.call_soon_threadsafe(enqueue_chunk, indata.copy())
 
         stream = None
         ws = None
@@ -315,117 +342,125 @@ class FunASRPlugin(BasePlugin):
                 while not self.stop_event.is_set():
                     try:
                         chunk = await asyncio.wait_for(q.get(), timeout=1.0)
-                        q.task_done()
-
-                        # 转换数据类型
-                        if chunk.dtype == np.int16:
-                            chunk_float32 = chunk.astype(np.float32) / 32768.0
-                        else:
-                            chunk_float32 = chunk
-
-                        # 计算音量
-                        volume = np.abs(chunk_float32).mean()
-                        is_speech = volume > self.voice_threshold
+                        # 一次取出队列中已积压的音频块，省去逐块 await q.get() 的调度开销；
+                        # 取出后仍逐块执行 VAD/发送，保持 block_size_samples 的检测粒度
+                        pending_chunks = [chunk]
+                        while len(pending_chunks) < MAX_DRAIN_CHUNKS:
+                            try:
+                                pending_chunks.append(q.get_nowait())
+                            except asyncio.QueueEmpty:
+                                break
+
+                        for chunk in pending_chunks:
+                            # 转换数据类型
+                            if chunk.dtype == np.int16:
+                                chunk_float32 = chunk.astype(np.float32) / 32768.0
+                            else:
+                                chunk_float32 = chunk
+
+                            # 计算音量
+                            volume = np.abs(chunk_float32).mean()
+                            is_speech = volume > self.voice_threshold
+
+                            if is_speech:
+                                if not is_recording:
+                                    is_recording = True
+                                    self.logger.info(f"检测到语音 (音量: {volume:.3f})")
+                                    if ws is None or ws.closed:
+                                        try:
+                                            # 连接 WebSocket
+                                            ws = await session.ws_connect(self.funasr_config["url"])
+
+                                            # 发送初始配置
+                                            init_message = {
+                                                "mode": "2pass",  # 使用2pass模式进行实时识别和句尾纠错
+                                                "wav_name": f"stream_{int(time.time())}",
+                                                "wav_format": "pcm",
+                                                "is_speaking": True,
+                                                "chunk_size": [5, 10, 5],  # 设置流式模型latency配置
+                                                "audio_fs": self.sample_rate,
+                                                "itn": True,  # 启用智能数字转换
+                                            }
+                                            await ws.send_json(init_message)
+                                            self.logger.debug("已发送 FunASR 初始配置")
+
+                                        except Exception as connect_err:
+                                            self.logger.error(f"连接或发送初始配置到 FunASR 失败: {connect_err}")
+                                            if ws and not ws.closed:
+                                                await ws.close()
+                                            ws = None
+                                            is_recording = False
+                                            continue
 
-                        if is_speech:
-                            if not is_recording:
-                                is_recording = True
-                                self.logger.info(f"检测到语音 (音量: {volume:.3f})")
-                                if ws is None or ws.closed:
+                                silence_counter = 0
+                                # 发送音频数据
+                                if ws and not ws.closed:
                                     try:
-                                        # 连接 WebSocket
-                                        ws = await session.ws_connect(self.funasr_config["url"])
-
-                                        # 发送初始配置
-                                        init_message = {
-                                            "mode": "2pass",  # 使用2pass模式进行实时识别和句尾纠错
-                                            "wav_name": f"stream_{int(time.time())}",
-                                            "wav_format": "pcm",
-                                            "is_speaking": True,
-                                            "chunk_size": [5, 10, 5],  # 设置流式模型latency配置
-                                            "audio_fs": self.sample_rate,
-                                            "itn": True,  # 启用智能数字转换
-                                        }
-                                        await ws.send_json(init_message)
-                                        self.logger.debug("已发送 FunASR 初始配置")
-
-                                    except Exception as connect_err:
-                                        self.logger.error(f"连接或发送初始配置到 FunASR 失败: {connect_err}")
+                                        if chunk.dtype == np.float32:
+                                            chunk_int16 = (chunk * 32767.0).astype(np.int16)
+                                        else:
+                                            chunk_int16 = chunk
+                                        await ws.send_bytes(chunk_int16.tobytes())
+                                    except Exception as send_err:
+                                        self.logger.error(f"发送音频数据失败: {send_err}")
                                         if ws and not ws.closed:
                                             await ws.close()
                                         ws = None
                                         is_recording = False
                                         continue
 
-                            silence_counter = 0
-                            # 发送音频数据
-                            if ws and not ws.closed:
-                                try:
-                                    if chunk.dtype == np.float32:
-                                        chunk_int16 = (chunk * 32767.0).astype(np.int16)
-                                    else:
-                                        chunk_int16 = chunk
-                                    await ws.send_bytes(chunk_int16.tobytes())
-                                except Exception as send_err:
-                                    self.logger.error(f"发送音频数据失败: {send_err}")
-                                    if ws and not ws.closed:
-                                        await ws.close()
-                                    ws = None
-                                    is_recording = False
-                                    continue
-
-                            audio_buffer.extend(chunk.flatten().tolist())
+                                recorded_samples += chunk.size
 
-                        elif is_recording:
-                            silence_counter += len(chunk)
-                            if silence_counter >= silence_samples or len(audio_buffer) >= max_samples:
-                                is_recording = False
-                                if ws and not ws.closed:
-                                    try:
-                                        # 发送结束标记
-                                        await ws.send_json({"is_speaking": False})
-
-                                        # 等待并接收结果
-                                        result_text = ""
-                                        timeout = time.time() + 5  # 5秒超时
-                                        while time.time() < timeout:
-                                            try:
-                                                msg = await asyncio.wait_for(ws.receive(), 1.0)
-                                                if msg.type == aiohttp.WSMsgType.TEXT:
-                                                    data = json.loads(msg.data)
-                                                    if "text" in data:
-                                                        # 因为使用2pass模式，我们等待最终结果
-                                                        if data.get("mode") == "2pass-offline":
-                                                            result_text = data["text"]
-                                                            break
-                                                elif msg.type == aiohttp.WSMsgType.ERROR:
-                                                    self.logger.error(f"WebSocket错误: {ws.exception()}")
+                            elif is_recording:
+                                silence_counter += len(chunk)
+                                if silence_counter >= silence_samples or recorded_samples >= max_samples:
+                                    is_recording = False
+                                    if ws and not ws.closed:
+                                        try:
+                                            # 发送结束标记
+                                            await ws.send_json({"is_speaking": False})
+
+                                            # 等待并接收结果
+                                            result_text = ""
+                                            timeout = time.monotonic() + 5  # 5秒超时
+                                            while time.monotonic() < timeout:
+                                                try:
+                                                    msg = await asyncio.wait_for(ws.receive(), 1.0)
+                                                    if msg.type == aiohttp.WSMsgType.TEXT:
+                                                        data = json.loads(msg.data)
+                                                        if "text" in data:
+                                                            # 因为使用2pass模式，我们等待最终结果
+                                                            if data.get("mode") == "2pass-offline":
+                                                                result_text = data["text"]
+                                                                break
+                                                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                                                        self.logger.error(f"WebSocket错误: {ws.exception()}")
+                                                        break
+                                                except asyncio.TimeoutError:
+                                                    continue
+                                                except Exception as e:
+                                                    self.logger.error(f"接收结果时出错: {e}")
                                                     break
-                                            except asyncio.TimeoutError:
-                                                continue
-                                            except Exception as e:
-                                                self.logger.error(f"接收结果时出错: {e}")
-                                                break
-
-                                        # 关闭当前 WebSocket 连接
-                                        await ws.close()
-                                        ws = None
 
-                                        if result_text:
-                                            yield result_text
-                                        else:
-                                            yield "[无识别结果]"
-
-                                    except Exception as e:
-                                        self.logger.error(f"处理结果时出错: {e}")
-                                        yield f"[识别错误: {str(e)}]"
-                                        if ws and not ws.closed:
+                                            # 关闭当前 WebSocket 连接
                                             await ws.close()
-                                        ws = None
-                                else:
-                                    self.logger.info("语音段结束，但 WebSocket 已关闭")
-                                audio_buffer = []
-                                silence_counter = 0
+                                            ws = None
+
+                                            if result_text:
+                                                yield result_text
+                                            else:
+                                                yield "[无识别结果]"
+
+                                        except Exception as e:
+                                            self.logger.error(f"处理结果时出错: {e}")
+                                            yield f"[识别错误: {str(e)}]"
+                                            if ws and not ws.closed:
+                                                await ws.close()
+                                            ws = None
+                                    else:
+                                        self.logger.info("语音段结束，但 WebSocket 已关闭")
+                                    recorded_samples = 0
+                                    silence_counter = 0
 
                     except asyncio.TimeoutError:
                         continue
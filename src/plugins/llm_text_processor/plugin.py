@@ -1,6 +1,8 @@
 import asyncio
 import os
+import random
 import sys
+import time
 from typing import Dict, Any, Optional
 import traceback
 
@@ -46,6 +48,13 @@ class LLMTextProcessorPlugin(BasePlugin):
         self.model_name = self.config.get("model_name", "default-model")  # Provide a default
         self.timeout = self.config.get("timeout", 10)  # Provide a default
         self.max_retries = self.config.get("max_retries", 2)  # Provide a default
+        # 重试间隔按指数增长并加随机抖动，避免多个调用方同时重试；单次间隔不超过 retry_max_delay
+        self.retry_base_delay = self.config.get("retry_base_delay", 1.0)
+        self.retry_max_delay = self.config.get("retry_max_delay", 8.0)
+        # 熔断：连续 circuit_failure_threshold 次调用都因连接错误失败后，在 circuit_cooldown 秒内
+        # 直接跳过 LLM 调用 (返回 None，由调用方使用原文)，冷却结束后只放行一次试探调用
+        self.circuit_failure_threshold = max(1, self.config.get("circuit_failure_threshold", 3))
+        self.circuit_cooldown = self.config.get("circuit_cooldown", 30.0)
         self.cleanup_prompt = self.config.get("cleanup_prompt_template", "")  # Load cleanup prompt
         self.correction_prompt = self.config.get("correction_prompt_template", "")  # Load correction prompt
 
@@ -61,6 +70,11 @@ class LLMTextProcessorPlugin(BasePlugin):
             # self.enabled = False
             # return
 
+        # --- 熔断状态 ---
+        self._consecutive_failures = 0
+        self._circuit_open_until: Optional[float] = None  # 熔断结束时间 (monotonic)，None 表示未熔断
+        self._probe_in_flight = False  # 半开状态下是否已有试探调用在进行
+
         # --- Initialize OpenAI Client ---
         self.client: Optional[AsyncOpenAI] = None  # Ensure client is initialized to None
         try:
@@ -102,37 +116,67 @@ class LLMTextProcessorPlugin(BasePlugin):
 
     async def clean_text(self, text: str) -> Optional[str]:
         """Cleans the input text using the cleanup prompt."""
-        if not self.enabled or not self.cleanup_prompt:
-            self.logger.warning("文本清理功能未启用或缺少 Prompt。")
-            return None
-
-        prompt = self.cleanup_prompt.format(text=text)
-        self.logger.debug(f"请求清理文本: '{text[:50]}...'")
-        cleaned = await self._call_llm(prompt)
-        if cleaned:
-            self.logger.info(f"清理结果: '{cleaned[:50]}...'")
-        return cleaned
+        return await self._process_text(text, self.cleanup_prompt, "文本清理", "清理")
 
     async def correct_text(self, text: str) -> Optional[str]:
         """Corrects the input STT result using the correction prompt."""
-        if not self.enabled or not self.correction_prompt:
-            self.logger.warning("STT 修正功能未启用或缺少 Prompt。")
+        return await self._process_text(text, self.correction_prompt, "STT 修正", "修正")
+
+    async def _process_text(self, text: str, prompt_template: str, feature: str, action: str) -> Optional[str]:
+        """两个服务共用的流程：检查可用性、填充 Prompt、调用 LLM 并记录结果。"""
+        if not self.enabled or not prompt_template:
+            self.logger.warning(f"{feature}功能未启用或缺少 Prompt。")
             return None
 
-        prompt = self.correction_prompt.format(text=text)
-        self.logger.debug(f"请求修正 STT: '{text[:50]}...'")
-        corrected = await self._call_llm(prompt)
-        if corrected:
-            self.logger.info(f"修正结果: '{corrected[:50]}...'")
-        return corrected
+        prompt = prompt_template.format(text=text)
+        self.logger.debug(f"请求{action}: '{text[:50]}...'")
+        result = await self._call_llm(prompt)
+        if result:
+            self.logger.info(f"{action}结果: '{result[:50]}...'")
+        return result
 
     async def _call_llm(self, prompt: str) -> Optional[str]:
-        """Internal method to call the LLM with retry logic."""
+        """Internal method to call the LLM with retry logic and a circuit breaker."""
         if not self.client:
             return None
 
+        is_probe = False
+        if self._circuit_open_until is not None:
+            if time.monotonic() < self._circuit_open_until or self._probe_in_flight:
+                self.logger.debug("LLM 服务熔断中，跳过本次调用。")
+                return None
+            # 冷却结束 (半开)：放行这一次调用作为试探，其余调用在结果出来前继续跳过
+            self._probe_in_flight = True
+            is_probe = True
+
+        try:
+            return await self._call_llm_with_retries(prompt, max_retries=0 if is_probe else self.max_retries)
+        finally:
+            if is_probe:
+                self._probe_in_flight = False
+
+    def _record_connection_failure(self) -> None:
+        """记录一次因连接错误失败的调用，达到阈值 (或半开试探失败) 时熔断。"""
+        self._consecutive_failures += 1
+        if self._circuit_open_until is not None or self._consecutive_failures >= self.circuit_failure_threshold:
+            self._circuit_open_until = time.monotonic() + self.circuit_cooldown
+            self.logger.warning(
+                f"LLM 服务连续 {self._consecutive_failures} 次连接失败，{self.circuit_cooldown} 秒内跳过 LLM 调用。"
+            )
+
+    def _record_success(self) -> None:
+        """服务可达，重置失败计数并关闭熔断。"""
+        if not self._consecutive_failures and self._circuit_open_until is None:
+            return  # 常见情况：服务一直健康，无状态需要重置
+        if self._circuit_open_until is not None:
+            self.logger.info("LLM 服务已恢复，结束熔断。")
+        self._consecutive_failures = 0
+        self._circuit_open_until = None
+
+    async def _call_llm_with_retries(self, prompt: str, max_retries: int) -> Optional[str]:
+        """调用 LLM，连接错误时按指数退避 + 随机抖动重试。"""
         retries = 0
-        while retries <= self.max_retries:
+        while retries <= max_retries:
             try:
                 response = await self.client.chat.completions.create(
                     model=self.model_name,
@@ -140,6 +184,7 @@ class LLMTextProcessorPlugin(BasePlugin):
                     temperature=0.1,  # Low temperature for deterministic cleanup/correction
                     # max_tokens= # Optional: Set max tokens if needed
                 )
+                self._record_success()
                 result = response.choices[0].message.content
                 if result:
                     return result.strip()
@@ -148,11 +193,14 @@ class LLMTextProcessorPlugin(BasePlugin):
                     return None  # Return None for empty result
             except APIConnectionError as e:
                 retries += 1
-                self.logger.warning(f"LLM 连接错误 (尝试 {retries}/{self.max_retries}): {e}")
-                if retries > self.max_retries:
+                self.logger.warning(f"LLM 连接错误 (尝试 {retries}/{max_retries}): {e}")
+                if retries > max_retries:
                     self.logger.error(f"LLM 连接错误达到最大重试次数。{traceback.format_exc()}")
+                    self._record_connection_failure()
                     return None
-                await asyncio.sleep(1 * retries)  # Exponential backoff
+                # 指数退避 + 随机抖动 (0.5~1.5 倍)
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (retries - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
             except RateLimitError as e:
                 self.logger.error(f"LLM 速率限制错误: {e}。请检查您的账户配额。")
                 return None
@@ -46,6 +46,17 @@ class MinecraftPlugin(BasePlugin):
         self.group_id_str: Optional[str] = minecraft_config.get("group_id")
         self.nickname: str = minecraft_config.get("nickname", "Minecraft Observer")
 
+        # 每一步发送状态时都相同的消息字段在初始化时构建一次，
+        # 避免每一步都重新创建对象、重复解析 group_id (解析失败时也只警告一次)
+        self._user_info = UserInfo(platform=self.core.platform, user_id=str(self.user_id), user_nickname=self.nickname)
+        self._group_info: Optional[GroupInfo] = None
+        if self.group_id_str:
+            try:
+                self._group_info = GroupInfo(platform=self.core.platform, group_id=int(self.group_id_str))
+            except ValueError:
+                self.logger.warning(f"配置的 group_id '{self.group_id_str}' 不是有效的整数。将忽略 GroupInfo。")
+        self._format_info = FormatInfo(content_format="text", accept_format="text")  # 保持文本格式，内容是JSON字符串
+
         # --- 加载Template Items配置 ---
         self.enable_template_info = minecraft_config.get("enable_template_info", True)
         self.template_items = {}
@@ -132,21 +143,6 @@ class MinecraftPlugin(BasePlugin):
         current_time = int(time.time())
         message_id = f"mc_direct_{current_time}_{hash(prompted_message_content + str(self.user_id)) % 10000}"
 
-        user_info = UserInfo(platform=self.core.platform, user_id=str(self.user_id), user_nickname=self.nickname)
-
-        group_info_obj = None
-        if self.group_id_str:
-            try:
-                parsed_group_id = int(self.group_id_str)
-                group_info_obj = GroupInfo(
-                    platform=self.core.platform,
-                    group_id=parsed_group_id,
-                )
-            except ValueError:
-                self.logger.warning(f"配置的 group_id '{self.group_id_str}' 不是有效的整数。将忽略 GroupInfo。")
-
-        format_info = FormatInfo(content_format="text", accept_format="text")  # 保持文本格式，内容是JSON字符串
-
         # --- 构建Template Info ---
         final_template_info_value = None
         if self.enable_template_info:
@@ -163,9 +159,9 @@ class MinecraftPlugin(BasePlugin):
             platform=self.core.platform,
             message_id=message_id,
             time=current_time,
-            user_info=user_info,
-            group_info=group_info_obj,
-            format_info=format_info,
+            user_info=self._user_info,
+            group_info=self._group_info,
+            format_info=self._format_info,
             additional_config={
                 "source_plugin": "minecraft",
             },
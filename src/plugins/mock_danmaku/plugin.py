@@ -111,6 +111,8 @@ class MockDanmakuPlugin(BasePlugin):
         self.send_interval = max(0.1, self.config.get("send_interval", 1.0))  # 确保最小间隔
         self.loop_playback = self.config.get("loop_playback", True)
         self.start_immediately = self.config.get("start_immediately", True)
+        # 每轮并发发送的消息条数，1 表示保持逐条串行发送
+        self.batch_size = max(1, int(self.config.get("batch_size", 1)))
 
         # --- 状态变量 ---
         self._message_lines: List[str] = []  # 存储原始行以允许循环播放而无需重新读取
@@ -162,7 +164,7 @@ class MockDanmakuPlugin(BasePlugin):
             self.logger.debug("正在取消模拟弹幕发送任务...")
             self._task.cancel()
             try:
-                # 等待时间略长于间隔，以允许当前 sleep 完成
+                # 发送循环等待的是停止事件，通常会立即结束；超时仅用于兜底
                 await asyncio.wait_for(self._task, timeout=self.send_interval + 1)
             except asyncio.TimeoutError:
                 self.logger.warning("模拟弹幕发送任务在超时后未结束。")
@@ -181,57 +183,88 @@ class MockDanmakuPlugin(BasePlugin):
         """从 JSONL 文件加载消息行。"""
         self._message_lines = []
         self._current_line_index = 0
-        if not self.log_file_path.exists() or not self.log_file_path.is_file():
-            self.logger.error(f"日志文件未找到或不是文件: {self.log_file_path}")
-            return
-
         try:
+            # 一次 open + read 读入整个文件，不再预先 exists()/is_file() 多次 stat，每行也只 strip 一次
             with open(self.log_file_path, "r", encoding="utf-8") as f:
-                self._message_lines = [line.strip() for line in f if line.strip()]
+                content = f.read()
+            self._message_lines = [stripped for line in content.splitlines() if (stripped := line.strip())]
             self.logger.info(f"成功从 '{self.log_file_path.name}' 加载 {len(self._message_lines)} 行消息。")
+        except (FileNotFoundError, IsADirectoryError):
+            self.logger.error(f"日志文件未找到或不是文件: {self.log_file_path}")
         except Exception as e:
             self.logger.error(f"读取日志文件时出错: {self.log_file_path}: {e}", exc_info=True)
             self._message_lines = []  # 出错时清空
 
-    async def _run_sending_loop(self):
-        """后台循环，按间隔发送消息。"""
-        self.logger.info("模拟弹幕发送循环开始。")
-        while not self._stop_event.is_set():
-            if not self._message_lines:
-                self.logger.warning("消息列表为空，停止发送循环。")
-                break
+    def _next_line(self) -> Optional[str]:
+        """取出下一行待发送的消息，到达文件末尾且未启用循环播放时返回 None。"""
+        if not self._message_lines:
+            self.logger.warning("消息列表为空，停止发送循环。")
+            return None
 
-            if self._current_line_index >= len(self._message_lines):
-                if self.loop_playback:
-                    self.logger.info("到达文件末尾，循环播放已启用，重置索引。")
-                    self._current_line_index = 0
-                else:
-                    self.logger.info("到达文件末尾，循环播放已禁用，停止发送。")
-                    break  # 如果不循环则退出循环
+        if self._current_line_index >= len(self._message_lines):
+            if self.loop_playback:
+                self.logger.info("到达文件末尾，循环播放已启用，重置索引。")
+                self._current_line_index = 0
+            else:
+                self.logger.info("到达文件末尾，循环播放已禁用，停止发送。")
+                return None
 
-            # 重置后再次检查索引
-            if self._current_line_index >= len(self._message_lines):
-                self.logger.warning("索引仍然超出范围，停止循环。")  # 正常情况下不应发生
-                break
+        line = self._message_lines[self._current_line_index]
+        self._current_line_index += 1
+        return line
 
-            line = self._message_lines[self._current_line_index]
-            self._current_line_index += 1
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """最多等待 timeout 秒，期间收到停止信号则立即返回 True。"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
-            try:
-                # --- 解析并发送 ---
+    async def _run_sending_loop(self):
+        """后台循环，按间隔发送消息。batch_size > 1 时每轮并发发送一批消息。"""
+        self.logger.info(f"模拟弹幕发送循环开始 (每轮 {self.batch_size} 条)。")
+        while not self._stop_event.is_set():
+            # --- 取出本轮要发送的行 ---
+            batch: List[MessageBase] = []
+            reached_end = False
+            for _ in range(self.batch_size):
+                line = self._next_line()
+                if line is None:
+                    reached_end = True
+                    break
                 message = self._parse_line_to_message(line)
                 if message:
-                    self.logger.debug(
-                        f"发送模拟消息 (行 {self._current_line_index}): {message.raw_message[:50] if message.raw_message else message.message_segment}"
-                    )
-                    await self.core.send_to_maicore(message)
+                    batch.append(message)
                 else:
                     self.logger.warning(
                         f"解析消息失败 (行 {self._current_line_index}): {line[:100]}..."
                     )  # 记录失败的行
 
+            try:
+                # --- 发送 ---
+                if len(batch) == 1:
+                    message = batch[0]
+                    self.logger.debug(
+                        f"发送模拟消息 (行 {self._current_line_index}): {message.raw_message[:50] if message.raw_message else message.message_segment}"
+                    )
+                    await self.core.send_to_maicore(message)
+                elif batch:
+                    self.logger.debug(f"并发发送 {len(batch)} 条模拟消息 (至行 {self._current_line_index})")
+                    results = await asyncio.gather(
+                        *(self.core.send_to_maicore(m) for m in batch), return_exceptions=True
+                    )
+                    for result in results:
+                        if isinstance(result, Exception):
+                            self.logger.error(f"批量发送模拟消息时出错: {result}", exc_info=result)
+
+                if reached_end:
+                    break
+
                 # --- 等待 ---
-                await asyncio.sleep(self.send_interval)  # 发送下一条前等待
+                # 等待停止事件而不是固定 sleep，stop_mocking/cleanup 时可立即退出循环
+                if await self._wait_for_stop(self.send_interval):
+                    break
 
             except asyncio.CancelledError:
                 self.logger.info("模拟弹幕发送循环被取消。")
@@ -239,7 +272,8 @@ class MockDanmakuPlugin(BasePlugin):
             except Exception as e:
                 self.logger.error(f"发送模拟消息时发生意外错误 (行 {self._current_line_index}): {e}", exc_info=True)
                 # 可选地，在出错后继续之前添加短暂延迟
-                await asyncio.sleep(1)
+                if await self._wait_for_stop(1):
+                    break
 
         self.logger.info("模拟弹幕发送循环已结束。")
         # 确保任务完成后清除任务引用
@@ -5,8 +5,10 @@ import tomllib
 import os
 import time
 import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 # 导入全局logger - 在确认不再需要后移除
 # from src.utils.logger import logger # 将在确认后移除
@@ -95,6 +97,12 @@ class ScreenMonitorPlugin(BasePlugin):
 
         # --- 加载配置 (使用新配置项) ---
         self.interval = self.config.get("screenshot_interval_seconds", 10)
+        # 自适应截图间隔：画面连续不变时按倍数放慢截图，最长不超过 max_interval；画面变化时立即恢复为 interval
+        self.max_interval = max(self.interval, self.config.get("max_screenshot_interval_seconds", 60))
+        self.idle_backoff_factor = max(1.0, self.config.get("idle_backoff_factor", 1.5))
+        # VL 调用是整个循环中最昂贵的一步 (网络往返 + API 费用)，可选地限制两次调用之间的最小间隔；
+        # 未到间隔时跳过本轮截图，上下文继续提供缓存的上一次描述。默认 0 表示不限制
+        self.min_vl_interval = max(0.0, self.config.get("min_vl_interval_seconds", 0))
         self.api_key = self.config.get("api_key", None)  # 通用 API Key
         self.base_url = self.config.get("openai_compatible_base_url", None)  # OpenAI 兼容 URL
         self.model_name = self.config.get("model_name", "qwen-vl-plus")  # 模型名称
@@ -121,8 +129,19 @@ class ScreenMonitorPlugin(BasePlugin):
         self.openai_client: Optional[AsyncOpenAI] = None  # OpenAI 客户端实例
         self._monitor_task: Optional[asyncio.Task] = None
         self.is_running = False
+        self._stop_event = asyncio.Event()  # 置位后监控循环立即退出，无需等待本轮间隔结束
         self.latest_description = "屏幕信息尚未获取。"
         self.description_lock = asyncio.Lock()  # 保护 latest_description 的访问
+        # 截图句柄及显示器区域在首次截图时创建并复用，避免每次截图都重新打开显示连接、枚举显示器
+        self._sct: Optional["mss.base.MSSBase"] = None
+        self._monitor_region: Optional[Dict[str, int]] = None
+        # 截图与 PNG 编码是同步阻塞操作，放到专用的单线程执行器中运行，避免阻塞事件循环；
+        # 固定单个线程也保证缓存的截图句柄始终在同一线程中创建和使用
+        self._grab_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ScreenGrab")
+        # 最近一次成功获取描述的画面摘要；画面未变化时跳过编码和 VL 调用
+        self._last_described_digest: Optional[bytes] = None
+        self._current_interval = self.interval
+        self._last_vl_call_time: Optional[float] = None  # 上一次发起 VL 调用的时间 (monotonic)
 
         # --- 初始化 OpenAI 客户端 ---
         try:
@@ -171,12 +190,14 @@ class ScreenMonitorPlugin(BasePlugin):
 
         # 启动后台监控循环 (保持不变)
         self.is_running = True
+        self._stop_event.clear()
         self._monitor_task = asyncio.create_task(self._monitoring_loop(), name="ScreenMonitorLoop")
         self.logger.info("屏幕监控后台任务已启动。")
 
     async def cleanup(self):
         self.logger.info("正在清理 ScreenMonitorPlugin...")
         self.is_running = False  # 通知后台任务停止
+        self._stop_event.set()  # 唤醒正在等待下一轮的监控循环
 
         # 取消并等待后台任务 (保持不变)
         if self._monitor_task and not self._monitor_task.done():
@@ -189,6 +210,13 @@ class ScreenMonitorPlugin(BasePlugin):
             except asyncio.CancelledError:
                 pass  # 预期行为
 
+        # --- 释放截图句柄 (在截图线程中关闭)，并关闭执行器 ---
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._grab_executor, self._reset_screen_grabber)
+        except Exception as e:
+            self.logger.warning(f"释放截图句柄时出错: {e}")
+        self._grab_executor.shutdown(wait=False)
+
         # --- 关闭 OpenAI 客户端 ---
         if self.openai_client:
             try:
@@ -220,61 +248,117 @@ class ScreenMonitorPlugin(BasePlugin):
     async def _monitoring_loop(self):
         """后台任务：定期截图并调用 VL 模型更新描述。"""
         self.logger.info("屏幕监控循环启动。")
-        while self.is_running:
+        while not self._stop_event.is_set():
             start_time = time.monotonic()
+            screen_unchanged: Optional[bool] = False
             try:
-                await self._capture_and_process_screenshot()
+                screen_unchanged = await self._capture_and_process_screenshot()
             except Exception as e:
                 # 捕获截图或处理中的意外错误
                 self.logger.error(f"屏幕监控循环中发生错误: {e}", exc_info=True)
 
+            # --- 自适应间隔：画面不变则逐步放慢，画面变化 (或出错) 则恢复基础间隔 ---
+            # 因 min_vl_interval 跳过的轮次 (None) 没有观察到画面，保持当前间隔不变
+            if screen_unchanged is None:
+                pass
+            elif screen_unchanged:
+                self._current_interval = min(self.max_interval, self._current_interval * self.idle_backoff_factor)
+            else:
+                self._current_interval = self.interval
+
             # --- 计算等待时间 ---
             elapsed = time.monotonic() - start_time
-            wait_time = max(0, self.interval - elapsed)
-            self.logger.debug(f"本次屏幕处理耗时 {elapsed:.2f}s，将等待 {wait_time:.2f}s 进行下一次。")
+            wait_time = max(0, self._current_interval - elapsed)
+            # 监控循环中的 DEBUG 日志使用 loguru 的参数格式，DEBUG 未启用时不做字符串格式化
+            self.logger.debug("本次屏幕处理耗时 {:.2f}s，将等待 {:.2f}s 进行下一次。", elapsed, wait_time)
 
             try:
-                # 使用 asyncio.sleep 进行可中断的等待
-                await asyncio.sleep(wait_time)
+                # 等待停止事件或超时：停止时立即醒来退出，而不是睡满整个间隔
+                await asyncio.wait_for(self._stop_event.wait(), timeout=wait_time)
+                break
+            except asyncio.TimeoutError:
+                pass
             except asyncio.CancelledError:
                 self.logger.info("屏幕监控循环被取消。")
                 break  # 退出循环
         self.logger.info("屏幕监控循环结束。")
 
-    async def _capture_and_process_screenshot(self):
-        """执行截图、编码和调用 VL 模型。"""
+    async def _capture_and_process_screenshot(self) -> Optional[bool]:
+        """执行截图、编码和调用 VL 模型。
+
+        Returns:
+            画面与上次成功描述时相同 (已跳过编码和 VL 调用) 时返回 True；
+            因未到 min_vl_interval 而跳过本轮 (未截图) 时返回 None；否则返回 False
+        """
         if not self.openai_client:
-            return  # 检查 OpenAI 客户端
+            return False  # 检查 OpenAI 客户端
+
+        if self._last_vl_call_time is not None:
+            since_last_call = time.monotonic() - self._last_vl_call_time
+            if since_last_call < self.min_vl_interval:
+                self.logger.debug(
+                    "距上次 VL 调用仅 {:.1f}s (最小间隔 {}s)，跳过本轮截图。", since_last_call, self.min_vl_interval
+                )
+                return None
 
         self.logger.debug("正在截取屏幕...")
         encoded_image: Optional[str] = None
+        loop = asyncio.get_running_loop()
         try:
-            with mss.mss() as sct:
-                monitor = sct.monitors[1]
-                sct_img = sct.grab(monitor)
-                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                buffer = BytesIO()
-                img.save(buffer, format="PNG")
-                img_bytes = buffer.getvalue()
-                encoded_image = base64.b64encode(img_bytes).decode("utf-8")
-                self.logger.debug(f"截图成功并编码为 Base64 (大小: {len(encoded_image)} bytes)")
+            digest, encoded_image = await loop.run_in_executor(self._grab_executor, self._grab_screenshot_base64)
         except Exception as e:
             self.logger.error(f"截图或编码失败: {e}", exc_info=True)
-            return
+            # 句柄可能已失效 (如显示器配置变化)，下次截图时重新创建
+            await loop.run_in_executor(self._grab_executor, self._reset_screen_grabber)
+            return False
 
-        if not encoded_image:
-            return
+        if encoded_image is None:
+            self.logger.debug("屏幕内容未变化，跳过 VL 模型调用。")
+            return True
+        self.logger.debug("截图成功并编码为 Base64 (大小: {} bytes)", len(encoded_image))
 
         # --- 调用 VL 模型 (使用新方法) ---
-        self.logger.debug(f"准备调用 VL 模型: {self.model_name} (通过 OpenAI 兼容接口)")
+        self.logger.debug("准备调用 VL 模型: {} (通过 OpenAI 兼容接口)", self.model_name)
+        self._last_vl_call_time = time.monotonic()  # 无论成功与否都计入，避免失败时频繁重试
         new_description = await self._query_vl_model(encoded_image)  # 调用重命名后的方法
 
         if new_description:
             async with self.description_lock:
                 self.latest_description = new_description
+            # 只有成功获取描述后才记录画面摘要，失败时下次即使画面相同也会重试
+            self._last_described_digest = digest
             self.logger.info(f"屏幕描述已更新: {new_description[:100]}...")
         else:
             self.logger.warning("未能从 VL 模型获取有效描述。")
+        return False
+
+    def _grab_screenshot_base64(self) -> Tuple[bytes, Optional[str]]:
+        """(在截图线程中运行) 截取主显示器并编码为 PNG Base64。截图句柄与显示器区域惰性创建后复用。
+
+        Returns:
+            (原始像素摘要, Base64 编码)；画面与上次成功描述时相同则不编码，编码部分为 None
+        """
+        if self._sct is None:
+            self._sct = mss.mss()
+            self._monitor_region = self._sct.monitors[1]
+        sct_img = self._sct.grab(self._monitor_region)
+        digest = hashlib.blake2b(sct_img.bgra, digest_size=16).digest()
+        if digest == self._last_described_digest:
+            return digest, None
+        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return digest, base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+    def _reset_screen_grabber(self):
+        """(在截图线程中运行) 关闭并丢弃缓存的截图句柄。"""
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+        self._sct = None
+        self._monitor_region = None
 
     async def _query_vl_model(self, base64_image: str) -> Optional[str]:
         """通过 OpenAI 兼容接口调用 VL 模型获取图像描述。"""
@@ -299,13 +383,13 @@ class ScreenMonitorPlugin(BasePlugin):
         ]
 
         try:
-            self.logger.debug(f"向 {self.base_url} 发送 OpenAI 兼容请求 (模型: {self.model_name})...")
+            self.logger.debug("向 {} 发送 OpenAI 兼容请求 (模型: {})...", self.base_url, self.model_name)
             completion = await self.openai_client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 max_tokens=300,  # 可以根据需要调整 max_tokens
             )
-            self.logger.debug(f"OpenAI 兼容 API 响应: {completion}")
+            self.logger.debug("OpenAI 兼容 API 响应: {}", completion)  # 完整响应的 repr 较长，仅在 DEBUG 输出时才格式化
 
             # 解析响应
             if completion.choices and completion.choices[0].message:
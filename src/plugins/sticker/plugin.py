@@ -1,8 +1,9 @@
 # src/plugins/vtube_studio/plugin.py
 import asyncio
+import heapq
 import tomllib
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import aiohttp
 import time
 from PIL import Image
@@ -42,6 +43,12 @@ class StickerPlugin(BasePlugin):
         self.last_trigger_time: float = 0.0
         self.display_duration_seconds = self.config.get("display_duration_seconds", 3)
 
+        # 待卸载贴纸的到期堆: [(到期时间(monotonic), item_instance_id), ...]
+        # 由单个常驻任务按最早到期时间统一卸载，避免每个贴纸各自持有一个等待中的协程
+        self._unload_heap: List[Tuple[float, str]] = []
+        self._unload_event = asyncio.Event()
+        self._unload_task: Optional[asyncio.Task] = None
+
     def resize_image_base64(self, base64_str: str) -> str:
         """将base64图片调整为配置中指定的大小，保持原始比例"""
         try:
@@ -86,6 +93,7 @@ class StickerPlugin(BasePlugin):
             return
 
         self.core.register_websocket_handler("emoji", self.handle_maicore_message)
+        self._unload_task = asyncio.create_task(self._unload_loop(), name="StickerUnloadLoop")
 
         self.logger.info("表情贴纸插件设置完成")
 
@@ -94,6 +102,22 @@ class StickerPlugin(BasePlugin):
         # --- 新插件的清理逻辑 ---
         # 例如: 取消注册、关闭连接等
         # self.core.unregister_command(...)
+        if self._unload_task and not self._unload_task.done():
+            self._unload_task.cancel()
+            try:
+                await self._unload_task
+            except asyncio.CancelledError:
+                pass
+        self._unload_task = None
+
+        # 尽力卸载仍在显示中的贴纸
+        if self._unload_heap:
+            pending_ids = [item_id for _, item_id in self._unload_heap]
+            self._unload_heap.clear()
+            try:
+                await self._unload_items(pending_ids)
+            except Exception as e:
+                self.logger.warning(f"清理时卸载剩余表情贴纸失败: {e}")
 
         await super().cleanup()
         self.logger.info("表情贴纸插件清理完成")
@@ -102,6 +126,51 @@ class StickerPlugin(BasePlugin):
     # 例如: 处理消息、执行分析等
     # async def analyze_emotion(self, text: str): ...
 
+    def _schedule_unload(self, item_instance_id: str) -> None:
+        """登记贴纸的卸载时间，并唤醒卸载任务重新计算下一个到期时间。"""
+        deadline = time.monotonic() + self.display_duration_seconds
+        heapq.heappush(self._unload_heap, (deadline, item_instance_id))
+        self._unload_event.set()
+
+    async def _unload_loop(self):
+        """常驻任务：睡眠到最早到期的贴纸，然后一次性卸载所有已到期的贴纸。"""
+        while True:
+            if not self._unload_heap:
+                self._unload_event.clear()
+                await self._unload_event.wait()
+                continue
+
+            delay = self._unload_heap[0][0] - time.monotonic()
+            if delay > 0:
+                # 新贴纸登记时会 set 事件，提前醒来重新检查堆顶
+                self._unload_event.clear()
+                try:
+                    await asyncio.wait_for(self._unload_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            expired_ids = []
+            while self._unload_heap and self._unload_heap[0][0] <= now:
+                expired_ids.append(heapq.heappop(self._unload_heap)[1])
+
+            try:
+                await self._unload_items(expired_ids)
+            except Exception as e:
+                self.logger.error(f"卸载表情贴纸时出错: {e}", exc_info=True)
+
+    async def _unload_items(self, item_instance_ids: List[str]):
+        """通过 VTS 控制服务在一次请求中卸载多个贴纸。"""
+        vts_control_service = self.core.get_service("vts_control")
+        if not vts_control_service:
+            self.logger.warning(f"未找到 VTS 控制服务。无法卸载 {len(item_instance_ids)} 个表情贴纸。")
+            return
+
+        success = await vts_control_service.unload_item(item_instance_id_list=item_instance_ids)
+        if not success:
+            self.logger.error("表情贴纸卸载失败")
+
     async def handle_maicore_message(self, message: MessageBase):
         """处理从 MaiCore 收到的消息，如果是文本类型，则进行处理，触发热键。"""
         if not message or not message.message_segment or message.message_segment.type != "emoji":
@@ -117,8 +186,8 @@ class StickerPlugin(BasePlugin):
         # --- 冷却时间检查结束 ---
 
         image_base64 = message.message_segment.data
-        # 调整图片大小
-        resized_image_base64 = self.resize_image_base64(image_base64)
+        # 调整图片大小 (解码/缩放/PNG 编码均为 CPU 密集操作，放到线程中执行以免阻塞事件循环)
+        resized_image_base64 = await asyncio.to_thread(self.resize_image_base64, image_base64)
 
         vts_control_service = self.core.get_service("vts_control")
         if not vts_control_service:
@@ -136,13 +205,8 @@ class StickerPlugin(BasePlugin):
             self.logger.error("表情贴纸加载失败")
             return
 
-        await asyncio.sleep(self.display_duration_seconds)
-
-        success = await vts_control_service.unload_item(
-            item_instance_id_list=[item_instance_id],
-        )
-        if not success:
-            self.logger.error("表情贴纸卸载失败")
+        # 交给卸载任务在显示时间结束后统一卸载，处理器无需在此等待
+        self._schedule_unload(item_instance_id)
 
 
 # --- Plugin Entry Point ---
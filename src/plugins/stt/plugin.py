@@ -11,9 +11,9 @@ import hmac
 import json
 import ssl
 import time
-import collections  # Keep collections for potential future use if needed
+import collections
 import numpy as np
-from datetime import datetime
+from email.utils import formatdate
 from time import mktime
 from urllib.parse import urlencode, quote
 from typing import Dict, Any, Optional, List, Tuple
@@ -129,6 +129,31 @@ class STTPlugin(BasePlugin):
             if not self.template_items:
                 self.logger.warning("配置启用了 template_info，但在 message_config 中未找到 template_items。")
 
+        # --- 预先构建每条消息共享的静态字段，运行期间不会变化，避免每次识别结果都重复创建 ---
+        cfg = self.message_config
+        self._user_info = UserInfo(
+            platform=self.core.platform,
+            user_id=str(cfg.get("user_id", "stt_user")),  # Ensure string
+            user_nickname=cfg.get("user_nickname", "语音"),
+            user_cardname=cfg.get("user_cardname", ""),
+        )
+        self._group_info: Optional[GroupInfo] = None
+        if cfg.get("enable_group_info", False):  # Default to False unless specified
+            self._group_info = GroupInfo(
+                platform=self.core.platform,
+                group_id=str(cfg.get("group_id", "stt_group")),  # Ensure string
+                group_name=cfg.get("group_name", "stt_default"),
+            )
+        self._format_info = FormatInfo(
+            content_format=cfg.get("content_format", ["text"]),
+            accept_format=cfg.get("accept_format", ["text", "vts_command"]),
+        )
+        self._additional_config_base: Dict[str, Any] = {
+            **cfg.get("additional_config", {}),
+            "source": "stt_plugin",  # Identify source
+            "sender_name": self._user_info.user_nickname,  # Convenience
+        }
+
         # --- iFlytek Config Check ---
         if not all([self.iflytek_config.get(k) for k in ["appid", "api_key", "api_secret", "host", "path"]]):
             self.logger.error("讯飞 ASR 配置不完整 (appid, api_key, api_secret, host, path)，STT 插件禁用。")
@@ -207,7 +232,11 @@ class STTPlugin(BasePlugin):
         # --- Control Flow & State ---
         self._stt_task: Optional[asyncio.Task] = None
         self.stop_event = asyncio.Event()
-        self._internal_audio_queue = asyncio.Queue(maxsize=100)  # Internal queue for audio chunks
+        # 单生产者/单消费者：deque + Event 代替 asyncio.Queue，省去 getter/putter 回调的开销
+        # maxlen 满时 append 会自动丢弃最旧的音频块（保留最新音频）；
+        # 注意与原来 Queue(maxsize=100) 不同，后者 put_nowait 会拒绝最新的音频块
+        self._internal_audio_buffer: collections.deque = collections.deque(maxlen=100)
+        self._audio_available = asyncio.Event()
 
         # WebSocket and Session state variables
         self._session: Optional[aiohttp.ClientSession] = None
@@ -224,6 +253,7 @@ class STTPlugin(BasePlugin):
             self.logger.error("sounddevice library not available.")
             return None
         try:
+            # 设备列表只查询一次，默认设备的信息也从中直接读取，不再单独向 PortAudio 查询
             devices = sd.query_devices()
             if device_name:
                 for i, device in enumerate(devices):
@@ -239,7 +269,7 @@ class STTPlugin(BasePlugin):
                 self.logger.warning(f"未找到默认 {kind} 设备。将尝试使用 None (由 sounddevice 选择)。")
                 return None
 
-            default_device_info = sd.query_devices(default_index)
+            default_device_info = devices[default_index]
             if default_device_info[f"max_{kind}_channels"] > 0:
                 self.logger.info(f"使用默认 {kind} 设备索引: {default_index} ({default_device_info['name']})")
                 return default_index
@@ -464,6 +494,12 @@ class STTPlugin(BasePlugin):
             if receiver_task_to_await and not receiver_task_to_await.done():
                 receiver_task_to_await.cancel()
 
+    def _push_audio_chunk(self, audio_bytes: bytes):
+        """在事件循环线程中将音频块放入内部缓冲区并唤醒 worker。"""
+        # deque 设置了 maxlen，处理跟不上输入时会自动丢弃最旧的数据，VAD 会处理分段
+        self._internal_audio_buffer.append(audio_bytes)
+        self._audio_available.set()
+
     # --- Main Worker (New for True Streaming) ---
     async def _stt_worker(self):
         """
@@ -477,7 +513,8 @@ class STTPlugin(BasePlugin):
 
         loop = asyncio.get_event_loop()
         stream = None
-        self._internal_audio_queue = asyncio.Queue(maxsize=100)  # Ensure queue is created
+        self._internal_audio_buffer.clear()
+        self._audio_available.clear()
 
         def audio_callback(indata: np.ndarray, frame_count: int, time_info: Any, status: sd.CallbackFlags):
             """Callback function for sounddevice stream. Puts raw bytes into queue."""
@@ -508,12 +545,8 @@ class STTPlugin(BasePlugin):
                     else:
                         audio_bytes = indata_int16.tobytes()  # Fallback
 
-                # Put data into the internal queue
-                loop.call_soon_threadsafe(self._internal_audio_queue.put_nowait, audio_bytes)
-            except asyncio.QueueFull:
-                # This is okay, means processing is slower than input, VAD will handle segments
-                # self.logger.warning("Internal STT audio queue full! Discarding data.") # Too noisy
-                pass
+                # Put data into the internal buffer (on the event loop thread)
+                loop.call_soon_threadsafe(self._push_audio_chunk, audio_bytes)
             except Exception as e:
                 self.logger.error(f"Error in audio callback: {e}", exc_info=True)
 
@@ -538,11 +571,11 @@ class STTPlugin(BasePlugin):
 
             while not self.stop_event.is_set():
                 try:
-                    # Wait for audio chunk from the internal queue with timeout
-                    audio_chunk_bytes = await asyncio.wait_for(
-                        self._internal_audio_queue.get(), timeout=timeout_duration
-                    )
-                    self._internal_audio_queue.task_done()
+                    # Wait for audio chunk from the internal buffer with timeout
+                    if not self._internal_audio_buffer:
+                        self._audio_available.clear()
+                        await asyncio.wait_for(self._audio_available.wait(), timeout=timeout_duration)
+                    audio_chunk_bytes = self._internal_audio_buffer.popleft()
 
                 except asyncio.TimeoutError:
                     # Timeout: indicates potential end of speech due to lack of audio
@@ -807,7 +840,7 @@ class STTPlugin(BasePlugin):
                                             self.logger.warning("配置启用了 STT 修正，但未找到 'stt_correction' 服务。")
                                     # --- 使用 (可能) 修正后的文本发送消息到 Core ---
                                     message_to_send = await self._create_stt_message(final_text_to_send)
-                                    self.logger.debug(f"准备发送 STT 消息对象到 Core: {repr(message_to_send)}")
+                                    self.logger.debug("准备发送 STT 消息对象到 Core: {!r}", message_to_send)
                                     await self.core.send_to_maicore(message_to_send)
                                     self.logger.info(
                                         f"STT 结果已发送到 Core: {message_to_send.message_info.message_id}"
@@ -858,8 +891,8 @@ class STTPlugin(BasePlugin):
         host = cfg["host"]
         path = cfg["path"]
         url = f"wss://{host}{path}"
-        # Use UTC time for consistency
-        date = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+        # RFC 1123 格式的 GMT 时间：formatdate 直接从时间戳生成，且星期/月份名不受系统 locale 影响
+        date = formatdate(usegmt=True)
         signature_origin = f"host: {host}\ndate: {date}\nGET {path} HTTP/1.1"
         signature_sha = hmac.new(
             cfg["api_secret"].encode("utf-8"), signature_origin.encode("utf-8"), digestmod=hashlib.sha256
@@ -918,31 +951,6 @@ class STTPlugin(BasePlugin):
         timestamp = time.time()
         cfg = self.message_config
 
-        # --- User Info ---
-        user_id_from_config = cfg.get("user_id", "stt_user")  # Use string ID consistently
-        user_info = UserInfo(
-            platform=self.core.platform,
-            user_id=str(user_id_from_config),  # Ensure string
-            user_nickname=cfg.get("user_nickname", "语音"),
-            user_cardname=cfg.get("user_cardname", ""),
-        )
-
-        # --- Group Info (Conditional) ---
-        group_info: Optional[GroupInfo] = None
-        if cfg.get("enable_group_info", False):  # Default to False unless specified
-            group_id_from_config = cfg.get("group_id", "stt_group")  # Use string ID
-            group_info = GroupInfo(
-                platform=self.core.platform,
-                group_id=str(group_id_from_config),  # Ensure string
-                group_name=cfg.get("group_name", "stt_default"),
-            )
-
-        # --- Format Info ---
-        format_info = FormatInfo(
-            content_format=cfg.get("content_format", ["text"]),
-            accept_format=cfg.get("accept_format", ["text", "vts_command"]),
-        )
-
         # --- Template Info (Conditional & Modification) ---
         final_template_info_value = None
         if cfg.get("enable_template_info", False) and self.template_items:
@@ -965,20 +973,18 @@ class STTPlugin(BasePlugin):
 
             final_template_info_value = {"template_items": modified_template_items}
 
-        # --- Additional Config ---
-        additional_config = cfg.get("additional_config", {}).copy()
-        additional_config["source"] = "stt_plugin"  # Identify source
-        additional_config["sender_name"] = user_info.user_nickname  # Convenience
+        # --- Additional Config (复制一份，避免下游修改影响共享的基础配置) ---
+        additional_config = dict(self._additional_config_base)
 
         # --- Base Message Info ---
         message_info = BaseMessageInfo(
             platform=self.core.platform,
             message_id=f"stt_{int(timestamp * 1000)}_{hash(text) % 10000}",
             time=int(timestamp),
-            user_info=user_info,
-            group_info=group_info,
+            user_info=self._user_info,
+            group_info=self._group_info,
             template_info=final_template_info_value,
-            format_info=format_info,
+            format_info=self._format_info,
             additional_config=additional_config,
         )
 
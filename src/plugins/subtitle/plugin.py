@@ -2,7 +2,6 @@
 
 import tomllib
 import os
-import time
 import platform
 import threading  # 用于运行 GUI
 import queue  # 用于线程间通信
@@ -19,6 +18,10 @@ from src.core.amaidesu_core import AmaidesuCore
 
 # --- Helper Function ---
 
+# 字幕文本清理映射表：换行替换为空格、移除回车。模块加载时构建一次，
+# 清理时由 str.translate 在 C 层一次遍历完成，无需链式 replace 生成中间字符串
+SUBTITLE_TRANSLATE_TABLE = str.maketrans({"\n": " ", "\r": None})
+
 
 # --- Plugin Class ---
 class SubtitlePlugin(BasePlugin):
@@ -63,7 +66,8 @@ class SubtitlePlugin(BasePlugin):
         self.gui_thread: Optional[threading.Thread] = None
         self.root: Optional[tk.Tk] = None
         self.text_label: Optional[tk.Label] = None
-        self.last_voice_time = time.time()
+        self._fade_after_id: Optional[str] = None  # 淡出定时器 (root.after 返回的 ID)
+        self._displayed_text = ""  # Label 当前显示的文本，仅在 GUI 线程中读写
         self.is_running = True  # 控制 GUI 线程循环
 
         self.logger.info("SubtitlePlugin (Screen Display) 初始化完成。")
@@ -116,9 +120,8 @@ class SubtitlePlugin(BasePlugin):
             self.text_label.bind("<B1-Motion>", self._on_move)
             self.text_label.bind("<Button-3>", lambda e: self._on_closing())  # 右键退出
 
-            # --- 启动队列检查和淡出循环 ---
+            # --- 启动队列检查循环 (淡出由每次更新字幕时设置的一次性定时器处理) ---
             self.root.after(100, self._check_queue)  # 每 100ms 检查一次队列
-            self.root.after(100, self._fade_out_text)  # 每 100ms 检查是否需要淡出
 
             self.logger.info("Subtitle GUI 启动成功。")
             self.root.mainloop()  # 运行 Tkinter 事件循环
@@ -140,11 +143,15 @@ class SubtitlePlugin(BasePlugin):
         if not self.is_running:
             return
         try:
-            while not self.text_queue.empty():
-                text = self.text_queue.get_nowait()
-                self._update_subtitle_display(text)
-        except queue.Empty:
-            pass
+            # 一次取空队列，只显示最新的一条：同一轮中积压的旧字幕马上会被覆盖，无需逐条刷新 Label
+            latest_text: Optional[str] = None
+            while True:
+                try:
+                    latest_text = self.text_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if latest_text is not None:
+                self._update_subtitle_display(latest_text)
         except Exception as e:
             self.logger.warning(f"检查字幕队列时出错: {e}", exc_info=True)
 
@@ -155,36 +162,43 @@ class SubtitlePlugin(BasePlugin):
         """更新 Tkinter Label 的文本并重置淡出计时器"""
         if self.text_label and self.is_running:
             try:
-                self.text_label.config(text=text)
-                # 重置为完全不透明
-                self.text_label.config(fg=self.text_color)
-                self.last_voice_time = time.time()
+                if text == self._displayed_text:
+                    # 与当前显示内容相同：无需重绘 Label，只需重置淡出计时
+                    self._schedule_fade_out()
+                    return
+                # 文本与颜色 (重置为完全不透明) 合并为一次 configure 调用，只往返 Tcl 解释器一次
+                self.text_label.config(text=text, fg=self.text_color)
+                self._displayed_text = text
+                self._schedule_fade_out()
                 # self.text_label.update() # 可能不需要显式 update
             except Exception as e:
                 self.logger.warning(f"更新字幕显示时出错: {e}", exc_info=True)
 
+    def _schedule_fade_out(self):
+        """重新设置淡出定时器：取消上一次的定时器，在 fade_delay_seconds 后清除字幕"""
+        # 仅当 fade_delay_seconds 大于 0 时才启用淡出
+        if self.fade_delay_seconds <= 0 or not self.root:
+            return
+        if self._fade_after_id is not None:
+            try:
+                self.root.after_cancel(self._fade_after_id)
+            except Exception:
+                pass  # 定时器可能已经触发
+        self._fade_after_id = self.root.after(int(self.fade_delay_seconds * 1000), self._fade_out_text)
+
     def _fade_out_text(self):
-        """在 GUI 线程中处理文字淡出效果 (简化版)"""
+        """在 GUI 线程中处理文字淡出效果 (简化版)，由淡出定时器触发"""
+        self._fade_after_id = None
         if not self.is_running or not self.text_label:
             return
 
         try:
-            # 仅当 fade_delay_seconds 大于 0 时才启用淡出
-            if self.fade_delay_seconds > 0 and time.time() - self.last_voice_time > self.fade_delay_seconds:
-                current_text = self.text_label.cget("text")
-                if current_text:  # 如果当前有文本，则清空
-                    self.logger.debug("淡出时间到，清除字幕。")
-                    self.text_label.config(text="")
-
-            # 不论是否淡出，都继续调度下一次检查
-            if self.is_running and self.root:
-                self.root.after(100, self._fade_out_text)
-
+            if self._displayed_text:  # 如果当前有文本，则清空
+                self.logger.debug("淡出时间到，清除字幕。")
+                self.text_label.config(text="")
+                self._displayed_text = ""
         except Exception as e:
             self.logger.warning(f"处理字幕淡出时出错: {e}", exc_info=True)
-            # 即使出错，也尝试继续调度
-            if self.is_running and self.root:
-                self.root.after(100, self._fade_out_text)
 
     # --- 窗口事件处理 ---
     def _start_move(self, event):
@@ -270,7 +284,7 @@ class SubtitlePlugin(BasePlugin):
             return
 
         # 清理文本 (移除换行符) - 可选
-        cleaned_text = text.replace("\n", " ").replace("\r", "")
+        cleaned_text = text.translate(SUBTITLE_TRANSLATE_TABLE)
 
         try:
             # 将文本放入队列
@@ -107,12 +107,25 @@ class TTSPlugin(BasePlugin):
         else:
             self.logger.info("TTS UDP 广播已禁用。")
 
+        # 服务注册后不会注销，首次查到即缓存，避免每条消息都经过 core.get_service 的查找与日志
+        self._service_cache: Dict[str, Any] = {}
+
+    def _get_service(self, name: str) -> Optional[Any]:
+        """获取服务实例，查到后缓存；未查到时不缓存，以便服务稍后注册时仍能被获取。"""
+        service = self._service_cache.get(name)
+        if service is None:
+            service = self.core.get_service(name)
+            if service is not None:
+                self._service_cache[name] = service
+        return service
+
     def _find_device_index(self, device_name: Optional[str], kind: str = "output") -> Optional[int]:
         """根据设备名称查找设备索引 (来自 tts_service.py)。"""
         if "sd" not in globals():  # Check if sounddevice was imported
             self.logger.error("sounddevice 库不可用，无法查找音频设备。")
             return None
         try:
+            # 设备列表只查询一次，默认设备的信息也从中直接读取，不再单独向 PortAudio 查询
             devices = sd.query_devices()
             if device_name:
                 for i, device in enumerate(devices):
@@ -129,7 +142,7 @@ class TTSPlugin(BasePlugin):
                 self.logger.warning(f"未找到默认 {kind} 设备，将使用 None (由 sounddevice 选择)。")
                 return None
 
-            self.logger.info(f"使用默认 {kind} 设备索引: {default_index} ({sd.query_devices(default_index)['name']})")
+            self.logger.info(f"使用默认 {kind} 设备索引: {default_index} ({devices[default_index]['name']})")
             return default_index
         except Exception as e:
             self.logger.error(f"查找音频设备时出错: {e}，将使用 None (由 sounddevice 选择)", exc_info=True)
@@ -167,7 +180,7 @@ class TTSPlugin(BasePlugin):
             final_text = original_text
 
             # 1. (可选) 清理文本 - 通过服务调用
-            cleanup_service = self.core.get_service("text_cleanup")
+            cleanup_service = self._get_service("text_cleanup")
             if cleanup_service:
                 self.logger.debug("找到 text_cleanup 服务，尝试清理文本...")
                 try:
@@ -252,7 +265,7 @@ class TTSPlugin(BasePlugin):
 
                 # --- 通知 Subtitle Service (如果获取到时长) ---
                 if duration_seconds is not None and duration_seconds > 0:
-                    subtitle_service = self.core.get_service("subtitle_service")
+                    subtitle_service = self._get_service("subtitle_service")
                     if subtitle_service:
                         self.logger.debug("找到 subtitle_service，准备记录语音信息...")
                         try:
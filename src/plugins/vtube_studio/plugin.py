@@ -15,7 +15,33 @@ from src.core.plugin_manager import BasePlugin
 from src.core.amaidesu_core import AmaidesuCore
 
 
+# 热键指令标记，例如 %{vts_trigger_hotkey:微笑}%
+HOTKEY_PATTERN = re.compile(r"%\{vts_trigger_hotkey:([^}]+)\}%")
+
+# InjectParameterDataRequest 允许的取值范围，超出范围 VTS 会直接返回 APIError
+PARAM_VALUE_MIN = -1000000.0
+PARAM_VALUE_MAX = 1000000.0
+
+
 # --- Helper Function ---
+def extract_hotkeys(text: str) -> tuple[list[str], str]:
+    """单次扫描文本，返回匹配到的热键名称列表以及移除所有热键标记后的文本。"""
+    hotkey_names: list[str] = []
+
+    def _collect(match: re.Match) -> str:
+        hotkey_names.append(match.group(1))
+        return ""
+
+    return hotkey_names, HOTKEY_PATTERN.sub(_collect, text)
+
+
+def clamp_parameter_value(value: float) -> float:
+    """将参数值限制在 VTS 允许的范围内。"""
+    if value < PARAM_VALUE_MIN:
+        return PARAM_VALUE_MIN
+    if value > PARAM_VALUE_MAX:
+        return PARAM_VALUE_MAX
+    return value
 
 
 # --- Plugin Class ---
@@ -34,6 +60,8 @@ class VTubeStudioPlugin(BasePlugin):
         self.vts: Optional[pyvts.vts] = None
         self._connection_task: Optional[asyncio.Task] = None
         self._is_connected_and_authenticated = False
+        # 热键列表缓存 (不可变元组)，每次建立连接/认证时失效
+        self._hotkey_list_cache: Optional[tuple[Dict[str, Any], ...]] = None
         self._auth_token = None
         self._auth_task = None
         self._stop_event = asyncio.Event()
@@ -107,6 +135,8 @@ class VTubeStudioPlugin(BasePlugin):
         """Internal task to connect, authenticate, and register context."""
         if not self.vts:
             return
+        # 重新连接后模型可能已变化，之前缓存的热键列表不再可信
+        self._hotkey_list_cache = None
         try:
             self.logger.info("Attempting to connect to VTube Studio...")
             await self.vts.connect()
@@ -167,25 +197,35 @@ class VTubeStudioPlugin(BasePlugin):
                     await self.vts.close()
                     self.logger.debug("Closed VTS connection due to auth failure.")
 
-    async def get_hotkey_list(self) -> Optional[list[Dict[str, Any]]]:
+    async def get_hotkey_list(self, force_refresh: bool = False) -> Optional[tuple[Dict[str, Any], ...]]:
         """Requests the list of available hotkeys from VTube Studio.
 
+        The result is cached until the next (re)connection, so repeated callers
+        (e.g. emotion judgement on every reply) do not round-trip to VTS each time.
+
+        Args:
+            force_refresh: Ignore the cached list and request it from VTS again.
+
         Returns:
-            A list of hotkey dictionaries (containing 'name', 'hotkeyID', etc.)
+            A tuple of hotkey dictionaries (containing 'name', 'hotkeyID', etc.)
             if successful, None otherwise.
         """
         if not self._is_connected_and_authenticated or not self.vts:
             self.logger.warning("Cannot get hotkey list: Not connected or authenticated.")
             return None
 
+        if self._hotkey_list_cache is not None and not force_refresh:
+            return self._hotkey_list_cache
+
         try:
             self.logger.warning("Requesting VTube Studio hotkey list...")
             response = await self.vts.request(self.vts.vts_request.requestHotKeyList())
 
-            if response and response.get("data") and "availableHotkeys" in response["data"]:
-                hotkeys = response["data"]["availableHotkeys"]
+            hotkeys = (response.get("data") or {}).get("availableHotkeys") if response else None
+            if hotkeys is not None:
+                self._hotkey_list_cache = tuple(hotkeys)
                 self.logger.warning(f"Received {len(hotkeys)} hotkeys from VTS.")
-                return hotkeys
+                return self._hotkey_list_cache
             else:
                 self.logger.warning(f"Could not get hotkey list from VTS or invalid response format: {response}")
                 return None
@@ -282,6 +322,7 @@ class VTubeStudioPlugin(BasePlugin):
             self.logger.debug("Unregistered VTS context providers.")
 
         self._is_connected_and_authenticated = False
+        self._hotkey_list_cache = None
         await super().cleanup()
 
     # --- Public method for triggering hotkey (to be called by CommandProcessor) ---
@@ -297,18 +338,15 @@ class VTubeStudioPlugin(BasePlugin):
             original_text = original_text.strip()
             self.logger.info(f"收到文本消息: '{original_text[:50]}...'")
 
-            # 使用正则表达式匹配热键标记
-            hotkey_pattern = r"%\{vts_trigger_hotkey:([^}]+)\}%"
-            hotkey_matches = re.findall(hotkey_pattern, original_text)
+            # 一次扫描同时提取热键标记并得到移除标记后的文本
+            hotkey_matches, final_text = extract_hotkeys(original_text)
+            final_text = final_text.strip()
 
             # 触发所有匹配到的热键
             for hotkey_name in hotkey_matches:
                 self.logger.info(f"尝试触发热键: {hotkey_name}")
                 await self.trigger_hotkey(hotkey_name)
 
-            # 移除所有热键标记，得到最终文本
-            final_text = re.sub(hotkey_pattern, "", original_text).strip()
-
             # 如果最终文本不为空，可以在这里添加其他处理逻辑
             if final_text:
                 self.logger.debug(f"处理后的文本: '{final_text[:50]}...'")
@@ -332,18 +370,20 @@ class VTubeStudioPlugin(BasePlugin):
             request_msg = self.vts.vts_request.requestTriggerHotKey(hotkeyID=hotkey_id)
             response = await self.vts.request(request_msg)
             # Check response for success/error if needed - pyvts might raise exceptions on API errors
-            if response and response.get("messageType") == "APIError":
+            # messageType 只读取一次，后续分支复用同一个局部变量
+            message_type = response.get("messageType") if response else None
+            if message_type == "APIError":
                 error_data = response.get("data", {})
                 self.logger.error(
                     f"API Error triggering hotkey '{hotkey_id}': ID {error_data.get('errorID')}, Msg: {error_data.get('message')}"
                 )
                 return False
-            elif response and response.get("messageType") == "HotkeyTriggerResponse":
+            elif message_type == "HotkeyTriggerResponse":
                 self.logger.info(f"Successfully sent trigger request for hotkey: {hotkey_id}")
                 return True
             else:
                 self.logger.warning(
-                    f"Unexpected response type when triggering hotkey '{hotkey_id}': {response.get('messageType') if response else 'No Response'}"
+                    f"Unexpected response type when triggering hotkey '{hotkey_id}': {message_type if response else 'No Response'}"
                 )
                 return False
 
@@ -389,7 +429,7 @@ class VTubeStudioPlugin(BasePlugin):
 
         try:
             response = await self.vts.request(
-                self.vts.vts_request.requestSetParameterValue(parameter_name, value, weight)
+                self.vts.vts_request.requestSetParameterValue(parameter_name, clamp_parameter_value(value), weight)
             )
             if response and response.get("messageType") == "InjectParameterDataResponse":
                 self.logger.info(f"成功设置 '{parameter_name}' 参数值为 {value}")
@@ -401,27 +441,52 @@ class VTubeStudioPlugin(BasePlugin):
             self.logger.error(f"设置 '{parameter_name}' 参数值失败: {e}", exc_info=True)
             return False
 
+    async def set_parameter_values(self, parameter_values: Dict[str, float], weight: float = 1) -> bool:
+        """
+        在一次 InjectParameterDataRequest 中同时设置多个 VTS 参数值
+        parameter_values : Dict[str, float]
+            参数名称 -> 数据值，范围为 [-1000000, 1000000]
+        weight : float, optional
+            可以混合你的值与 VTS 面部跟踪参数，从 0 到 1,
+        """
+        if not self._is_connected_and_authenticated or not self.vts:
+            self.logger.warning(f"无法设置参数值 {list(parameter_values)}: 未连接或未认证。")
+            return False
+
+        data = {
+            "faceFound": False,
+            "mode": "set",
+            "parameterValues": [
+                {"id": name, "value": clamp_parameter_value(value), "weight": weight}
+                for name, value in parameter_values.items()
+            ],
+        }
+        try:
+            response = await self.vts.request(
+                self.vts.vts_request.BaseRequest(message_type="InjectParameterDataRequest", data=data)
+            )
+            if response and response.get("messageType") == "InjectParameterDataResponse":
+                self.logger.info(f"成功设置参数值: {parameter_values}")
+                return True
+            else:
+                self.logger.warning(f"设置参数值 {parameter_values} 失败: {response}")
+                return False
+        except Exception as e:
+            self.logger.error(f"设置参数值 {parameter_values} 失败: {e}", exc_info=True)
+            return False
+
     async def close_eyes(self) -> bool:
         """
         闭眼
         """
-        # 并行闭上左右眼好像会有问题
-        # return await asyncio.gather(
-        #     self.set_parameter_value("EyeOpenLeft", 0), self.set_parameter_value("EyeOpenRight", 0)
-        # )
-        await self.set_parameter_value("EyeOpenLeft", 0)
-        await self.set_parameter_value("EyeOpenRight", 0)
+        # 左右眼在同一个请求中设置 (并行发送两个请求好像会有问题)
+        return await self.set_parameter_values({"EyeOpenLeft": 0, "EyeOpenRight": 0})
 
     async def open_eyes(self) -> bool:
         """
         睁眼
         """
-        # 并行睁开左右眼
-        # return await asyncio.gather(
-        #     self.set_parameter_value("EyeOpenLeft", 1), self.set_parameter_value("EyeOpenRight", 1)
-        # )
-        await self.set_parameter_value("EyeOpenLeft", 1)
-        await self.set_parameter_value("EyeOpenRight", 1)
+        return await self.set_parameter_values({"EyeOpenLeft": 1, "EyeOpenRight": 1})
 
     async def smile(self, value: float = 1) -> bool:
         """
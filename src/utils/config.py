@@ -60,34 +60,35 @@ def _ensure_component_configs(component_base_dir: str, component_type_name: str)
             logger.warning(f"指定的{component_type_name}目录 '{component_base_dir}' 不存在或不是一个目录。")
             return False
 
-        for item_name in os.listdir(component_base_dir):
-            component_item_path = os.path.join(component_base_dir, item_name)
-
-            if os.path.isdir(component_item_path) and not item_name.startswith("__"):
-                config_path = os.path.join(component_item_path, "config.toml")
-                template_path = os.path.join(component_item_path, "config-template.toml")
-
-                logger.debug(f"检查{component_type_name}目录: {item_name}")
-
-                template_exists = os.path.exists(template_path)
-                config_exists = os.path.exists(config_path)
-
-                if template_exists and not config_exists:
-                    try:
-                        shutil.copy2(template_path, config_path)
-                        logger.info(
-                            f"在{component_type_name} '{item_name}' 中: config.toml 不存在，已从 config-template.toml 复制。"
-                        )
-                        config_copied = True
-                    except Exception as e:
-                        logger.error(f"在{component_type_name} '{item_name}' 中: 从模板复制配置文件失败: {e}")
-                        # 考虑是否应该在这里抛出异常，或者让上层决定
-                elif not template_exists and not config_exists:
-                    logger.debug(
-                        f"在{component_type_name} '{item_name}' 中: 未找到 config.toml 或 config-template.toml。"
+        # scandir 的 DirEntry 自带文件类型信息，判断是否为目录时无需再逐项 stat
+        with os.scandir(component_base_dir) as entries:
+            component_dirs = [
+                (entry.name, entry.path) for entry in entries if not entry.name.startswith("__") and entry.is_dir()
+            ]
+
+        for item_name, component_item_path in component_dirs:
+            config_path = os.path.join(component_item_path, "config.toml")
+            template_path = os.path.join(component_item_path, "config-template.toml")
+
+            logger.debug(f"检查{component_type_name}目录: {item_name}")
+
+            template_exists = os.path.exists(template_path)
+            config_exists = os.path.exists(config_path)
+
+            if template_exists and not config_exists:
+                try:
+                    shutil.copy2(template_path, config_path)
+                    logger.info(
+                        f"在{component_type_name} '{item_name}' 中: config.toml 不存在，已从 config-template.toml 复制。"
                     )
-                elif template_exists and config_exists:
-                    logger.debug(f"在{component_type_name} '{item_name}' 中: config.toml 已存在。")
+                    config_copied = True
+                except Exception as e:
+                    logger.error(f"在{component_type_name} '{item_name}' 中: 从模板复制配置文件失败: {e}")
+                    # 考虑是否应该在这里抛出异常，或者让上层决定
+            elif not template_exists and not config_exists:
+                logger.debug(f"在{component_type_name} '{item_name}' 中: 未找到 config.toml 或 config-template.toml。")
+            elif template_exists and config_exists:
+                logger.debug(f"在{component_type_name} '{item_name}' 中: config.toml 已存在。")
 
         return config_copied
 
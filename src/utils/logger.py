@@ -2,6 +2,12 @@ import sys
 import inspect
 from loguru import logger
 
+# 统一的控制台日志格式，main.py 与 mock_maicore.py 重新配置 handler 时复用
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{line: <4}</cyan> | <cyan>{extra[module]}</cyan> - <level>{message}</level>"
+)
+
 # 移除默认的 handler
 logger.remove()
 
@@ -10,7 +16,7 @@ logger.add(
     sys.stderr,
     level="INFO",  # 可以根据需要调整日志级别
     colorize=True,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{line: <4}</cyan> | <cyan>{extra[module]}</cyan> - <level>{message}</level>",
+    format=LOG_FORMAT,
 )
 
 # 可以在这里添加其他的 handler，比如写入文件
@@ -23,4 +29,4 @@ def get_logger(module_name: str):
 
 
 # 导出配置好的 logger 获取函数
-__all__ = ["get_logger"]
+__all__ = ["get_logger", "LOG_FORMAT"]
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from maim_message import MessageBase
+from maim_message.message_base import BaseMessageInfo, Seg, UserInfo
+
+from src.core.amaidesu_core import AmaidesuCore
+from src.utils.logger import logger
+
+
+def _build_message_dict(text: str) -> dict:
+    """构建一条 text 类型消息的原始字典，模拟 Router 收到的数据。"""
+    message_info = BaseMessageInfo(
+        platform="test",
+        message_id="test-message",
+        time=time.time(),
+        user_info=UserInfo(platform="test", user_id=1, user_nickname="tester"),
+    )
+    return MessageBase(
+        message_info=message_info, message_segment=Seg(type="text", data=text), raw_message=text
+    ).to_dict()
+
+
+def test_failing_type_handler_with_braces_does_not_block_wildcard_handlers():
+    """类型处理器抛出含花括号的异常时，通配符处理器仍然执行，首次失败的日志记录附带异常。"""
+    records = []
+    sink_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    wildcard_calls = []
+
+    async def failing_text_handler(message: MessageBase):
+        raise KeyError("{'user_id': 1}")
+
+    async def wildcard_handler(message: MessageBase):
+        wildcard_calls.append(message.message_info.message_id)
+
+    async def run():
+        core = AmaidesuCore(platform="test", maicore_host="127.0.0.1", maicore_port=8000)
+        core.register_websocket_handler("text", failing_text_handler)
+        core.register_websocket_handler("*", wildcard_handler)
+        await core._handle_maicore_message(_build_message_dict("hello"))
+        await core._handle_maicore_message(_build_message_dict("hello again"))
+
+    try:
+        asyncio.run(run())
+    finally:
+        logger.remove(sink_id)
+
+    assert len(wildcard_calls) == 2
+
+    error_records = [r for r in records if r["level"].name == "ERROR"]
+    assert len(error_records) == 1
+    assert "failing_text_handler" in error_records[0]["message"]
+    assert "{'user_id': 1}" in error_records[0]["message"]
+    assert error_records[0]["exception"] is not None
+    assert error_records[0]["exception"].type is KeyError
+
+    # 同一处理器再次失败只记录警告，不附带堆栈
+    warning_records = [r for r in records if r["level"].name == "WARNING" and "再次出错" in r["message"]]
+    assert len(warning_records) == 1
+    assert warning_records[0]["exception"] is None
@@ -0,0 +1,36 @@
+import importlib
+import sys
+
+import pytest
+
+import src.pipelines.message_logger.pipeline as message_logger_pipeline
+
+
+@pytest.fixture(params=["orjson", "json"])
+def line_codec(request, monkeypatch):
+    """分别以 orjson 和标准库 json 作为后端加载模块，返回 (_dump_line, _load_line)。"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        # sys.modules 中置为 None 时 import 会抛 ImportError，模块回退到标准库 json
+        monkeypatch.setitem(sys.modules, "orjson", None)
+    module = importlib.reload(message_logger_pipeline)
+    yield module._dump_line, module._load_line
+    monkeypatch.undo()
+    importlib.reload(message_logger_pipeline)
+
+
+def test_dump_line_round_trips_non_str_keys(line_codec):
+    """非字符串键在两种后端下都应像标准库 json 一样转为字符串，而不是抛出 TypeError。"""
+    dump_line, load_line = line_codec
+    message = {"message_id": "1", "content": "你好", "extra": {1: "one", 2.5: "float", False: "bool", None: "none"}}
+
+    line = dump_line(message)
+
+    assert line.endswith("\n")
+    assert "你好" in line
+    assert load_line(line) == {
+        "message_id": "1",
+        "content": "你好",
+        "extra": {"1": "one", "2.5": "float", "false": "bool", "null": "none"},
+    }